@@ -0,0 +1,526 @@
+#!/usr/bin/env python
+# SPDX-License-Identifier: MIT
+
+"""
+test_engine.py
+Created    : 2026.10.18
+
+This program tests the behaviour of the library used by wordle-helper.py
+and its server (wordle_engine.py), with each engine where it applies
+(numpy only if it is installed.)
+
+Run it from this directory, either as a script, exiting with 1 if
+any test fails, or with pytest.
+
+"""
+
+import math
+import os
+import sys
+import tempfile
+import threading
+
+import wordle_engine
+from wordle_testing import ABC_STR, ENGINES, SMALL_WORDS, full_index, small_index
+import wordle_testing
+
+
+def test_wordlist_cache():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fname = os.path.join(tmp_dir, "words.txt")
+        with open(fname, "w") as f:
+            f.write("\n".join(SMALL_WORDS) + "\n")
+        path = wordle_engine.wordlist_cache_path(fname, 5)
+        words, abc_str, list_hash = wordle_engine.read_wordlist_cached(fname, 5, ABC_STR)
+        assert words == set(SMALL_WORDS)
+        assert list_hash == wordle_engine.wordlist_hash(SMALL_WORDS)
+        assert os.path.exists(path)
+        # Read back from the cache, with the hash stored in it
+        assert wordle_engine.read_wordlist_cached(fname, 5, ABC_STR) == (words, abc_str, list_hash)
+        # Only touched: still valid, just getting the list's new mtime
+        stat = os.stat(fname)
+        os.utime(fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert wordle_engine.read_wordlist_cached(fname, 5, ABC_STR) == (words, abc_str, list_hash)
+        with open(path, "rb") as f:
+            header = wordle_engine.WLC_HEADER.unpack(f.read(wordle_engine.WLC_HEADER.size))
+        assert header[2] == os.stat(fname).st_mtime_ns
+        # Changed contents (with the same size): rebuilt
+        with open(fname, "w") as f:
+            f.write("\n".join(["zebra"] + SMALL_WORDS[1:]) + "\n")
+        os.utime(fname, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+        words, abc_str, list_hash = wordle_engine.read_wordlist_cached(fname, 5, ABC_STR)
+        assert "zebra" in words and "aside" not in words
+        assert list_hash == wordle_engine.wordlist_hash(words)
+        assert wordle_engine.read_wordlist_cached(fname, 5, ABC_STR) == (words, abc_str, list_hash)
+
+
+def test_feedback_matrix():
+    if not wordle_engine.have_numpy():
+        return
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fbmatrix = wordle_engine.FeedbackMatrix(SMALL_WORDS, tmp_dir)
+        assert not fbmatrix.exists()
+        fbmatrix.build(ABC_STR, nworkers=1)
+        assert fbmatrix.exists()
+        fbmatrix.load()
+        # Every guess/answer pair has the code of the feedback Wordle gives
+        for guess in SMALL_WORDS:
+            row = fbmatrix.row(guess)
+            for answer in SMALL_WORDS:
+                code = wordle_engine.clues_code(wordle_engine.feedback(guess, answer))
+                assert row[fbmatrix.index[answer]] == code, (guess, answer)
+        # Filtering keeps exactly the answers getting the clues
+        engine = small_index("numpy").engine
+        for guess, clues in (("crane", "yy-yg"), ("aback", "g----"), ("geese", "--gg-")):
+            mask = fbmatrix.filter(engine.start(), guess, clues)
+            assert engine.words(mask) == sorted(w for w in SMALL_WORDS
+                if wordle_engine.feedback(guess, w) == clues)
+        # Built in parallel, the matrix is the same
+        with open(fbmatrix.path, "rb") as f:
+            serial = f.read()
+        os.remove(fbmatrix.path)
+        fbmatrix.build(ABC_STR, nworkers=2)
+        with open(fbmatrix.path, "rb") as f:
+            assert f.read() == serial
+    try:
+        wordle_engine.FeedbackMatrix(["abcdefghijk"])
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("feedback matrix accepted words of 11 letters")
+
+
+def expected_scores(guesses, answers, metric):
+    """Scores of rank_guesses, computed straight from their definition."""
+    scores = dict()
+    for guess in guesses:
+        sizes = dict()
+        for answer in answers:
+            clues = wordle_engine.feedback(guess, answer)
+            sizes[clues] = sizes.get(clues, 0) + 1
+        n = len(answers)
+        if metric == "entropy":
+            scores[guess] = -sum(c / n * math.log2(c / n) for c in sizes.values())
+        else:
+            scores[guess] = sum(c * c for c in sizes.values()) / n
+    return scores
+
+
+def test_rank_guesses():
+    guesses = SMALL_WORDS
+    answers = ["brisk", "frisk", "whisk", "slick", "crane", "crate", "trace", "react"]
+    fbmatrix = None
+    if wordle_engine.have_numpy():
+        tmp_dir = tempfile.TemporaryDirectory()
+        fbmatrix = wordle_engine.FeedbackMatrix(SMALL_WORDS, tmp_dir.name)
+        fbmatrix.build(ABC_STR, nworkers=1)
+        fbmatrix.load()
+    for metric, sign in (("entropy", -1), ("size", 1)):
+        expected = expected_scores(guesses, answers, metric)
+        for matrix in (None, fbmatrix):
+            ranking = wordle_engine.rank_guesses(guesses, answers, ABC_STR, metric, 1, matrix)
+            assert sorted(g for g, score in ranking) == sorted(guesses)
+            for guess, score in ranking:
+                assert abs(score - expected[guess]) < 1e-9, (metric, guess)
+            # Best first, and among equal scores, guesses that can be the answer
+            keys = [(sign * round(score, 9), guess not in answers) for guess, score in ranking]
+            assert keys == sorted(keys), metric
+    if fbmatrix is not None:
+        tmp_dir.cleanup()
+    assert wordle_engine.rank_guesses(guesses, [], ABC_STR) == []
+    stop = threading.Event()
+    stop.set()
+    assert wordle_engine.rank_guesses(guesses, answers, ABC_STR, stop=stop) is None
+    # Enough pairs to be scored by worker processes, with the same results
+    index = full_index()
+    guesses = sorted(index.words)
+    answers = guesses[::500]
+    assert wordle_engine.rank_guesses(guesses, answers, ABC_STR, "size", 2) == \
+        wordle_engine.rank_guesses(guesses, answers, ABC_STR, "size", 1)
+
+
+def test_first_guess_ranking():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ranking = wordle_engine.first_guess_ranking(SMALL_WORDS, ABC_STR, "entropy", 1,
+            cache_dir=tmp_dir)
+        assert ranking == wordle_engine.rank_guesses(SMALL_WORDS, SMALL_WORDS, ABC_STR, "entropy", 1)
+        # Read back from its cache file
+        assert len(os.listdir(tmp_dir)) == 1
+        cached = wordle_engine.first_guess_ranking(SMALL_WORDS, ABC_STR, "entropy", 1,
+            cache_dir=tmp_dir)
+        assert [g for g, score in cached] == [g for g, score in ranking]
+        assert all(abs(a[1] - b[1]) < 1e-9 for a, b in zip(cached, ranking))
+
+
+# Games as (answer, guesses), covering repeated letters in guesses and answers
+GAMES = [("brisk", ["aside", "slick"]), ("howdy", ["aside", "young", "moody"]),
+         ("geese", ["eerie", "sweet"]), ("abaca", ["aback", "cacao"]),
+         ("eerie", ["geese", "reeve"]), ("tweet", ["crane", "teeth"])]
+
+
+def test_engines_agree():
+    reference = frozenset(full_index().words)
+    for engine_name in ENGINES:
+        index = full_index(engine_name)
+        engine = index.engine
+        assert engine.count(index.start) == len(reference)
+        for answer, guesses in GAMES:
+            state = index.start
+            expected = reference
+            for guess in guesses:
+                cons = wordle_engine.compile_clues(guess, wordle_engine.feedback(guess, answer),
+                    index.abc)
+                filtered, remaining = engine.filter_steps(state, cons)
+                state = engine.filter(state, cons)
+                expected = cons.filter(expected)
+                assert engine.words(state) == engine.words(filtered) == sorted(expected), \
+                    (engine_name, answer, guess)
+                assert remaining[-1] == engine.count(state) == len(expected)
+                assert engine.contains(state, answer)
+            # States survive being saved as bytes, and can be subtracted
+            assert engine.words(engine.from_bytes(engine.to_bytes(state))) == sorted(expected)
+            rest = engine.minus(index.start, state)
+            assert engine.count(rest) == len(reference) - len(expected)
+            assert not engine.contains(rest, answer)
+
+
+def test_session_fork_undo():
+    for engine_name in ENGINES:
+        index = full_index(engine_name)
+        session = wordle_engine.WordleSession(index)
+        nwords = session.count()
+        assert session.undo() is None and session.count() == nwords
+        after_aside = session.apply("aside", "-yg--")
+        other = session.fork()
+        assert other.apply("SLICK", "Y-G-G") == 3
+        assert other.remaining() == ["brisk", "frisk", "whisk"]
+        # The session forked from is not affected by the fork's attempts
+        assert session.count() == after_aside and session.depth == 1
+        assert session.attempts() == [("aside", "-yg--")]
+        assert other.attempts() == [("aside", "-yg--"), ("slick", "y-g-g")]
+        # Invalid attempts are rejected without being recorded
+        for guess, clues in (("slic", "y-g-g"), ("sl1ck", "y-g-g"), ("slick", "y-g-"),
+                ("slick", "y-x-g")):
+            try:
+                other.apply(guess, clues)
+            except ValueError:
+                continue
+            raise AssertionError("attempt {0} {1} did not fail".format(guess, clues))
+        assert other.depth == 2 and other.count() == 3
+        assert other.undo() == ("slick", "y-g-g")
+        assert other.count() == after_aside and other.depth == 1
+        # Undoing the fork again leaves the session forked from where it was
+        assert other.undo() == ("aside", "-yg--") and other.count() == nwords
+        cons = wordle_engine.compile_clues("aside", "-yg--", index.abc)
+        assert session.remaining() == sorted(w for w in index.words if cons.matches(w))
+
+
+def test_decision_tree():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tree = wordle_engine.GreedyDecisionTree(SMALL_WORDS, "crane", tmp_dir)
+        assert not tree.exists()
+        tree.build(ABC_STR, nworkers=1)
+        # Every word is solved following the tree, in at most its depth guesses
+        guesses = dict()
+        for answer in SMALL_WORDS:
+            attempts = []
+            while True:
+                guess = tree.next_guess(attempts)
+                assert guess is not None and len(attempts) < tree.depth, answer
+                clues = wordle_engine.feedback(guess, answer)
+                attempts.append((guess, clues))
+                if clues == "ggggg":
+                    break
+            guesses[answer] = len(attempts)
+        assert tree.depth == max(guesses.values())
+        assert abs(tree.avg_cost - sum(guesses.values()) / len(SMALL_WORDS)) < 1e-9
+        assert tree.nfailed == sum(1 for n in guesses.values() if n > wordle_engine.MAX_GUESSES)
+        assert tree.next_guess([("crane", "-----"), ("crane", "-----")]) is None
+        # Saved and loaded back, the tree is the same
+        tree.save()
+        loaded = wordle_engine.GreedyDecisionTree(SMALL_WORDS, "crane", tmp_dir)
+        assert loaded.exists()
+        loaded.load()
+        assert (loaded.root, loaded.depth, loaded.avg_cost, loaded.nfailed) == \
+            (tree.root, tree.depth, tree.avg_cost, tree.nfailed)
+        # But not for another word list
+        other = wordle_engine.GreedyDecisionTree(SMALL_WORDS[1:], "crane", tmp_dir)
+        other.path = tree.path
+        assert not other.exists()
+        try:
+            other.load()
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("tree loaded for another word list")
+    # Guesses can be words no longer possible, when they split the rest better
+    words = ["bills", "fills", "gills", "hills", "kills", "mills", "pills", "sills", "tills",
+             "wills", "fight", "swamp", "knock"]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tree = wordle_engine.GreedyDecisionTree(words, "bills", tmp_dir)
+        tree.build(ABC_STR, nworkers=1)
+    assert tree.next_guess([("bills", "-gggg")]) == "fight"
+    assert tree.depth == 4 and tree.nfailed == 0
+
+
+def test_session_tree():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        index = small_index()
+        tree = wordle_engine.GreedyDecisionTree(index.words, "crane", tmp_dir)
+        tree.build(ABC_STR, nworkers=1)
+        other_tree = wordle_engine.GreedyDecisionTree(index.words, "aside", tmp_dir)
+        other_tree.build(ABC_STR, nworkers=1)
+    session = wordle_engine.WordleSession(index)
+    assert session.next_guess() is None
+    session.apply("crane", wordle_engine.feedback("crane", "geese"))
+    # Following a tree after some attempts, and as attempts are made and undone
+    session.follow(tree)
+    attempts = session.attempts()
+    assert session.next_guess() == tree.next_guess(attempts)
+    guess = session.next_guess()
+    session.apply(guess, wordle_engine.feedback(guess, "geese"))
+    assert session.next_guess() == tree.next_guess(session.attempts())
+    fork = session.fork()
+    session.undo()
+    assert session.next_guess() == tree.next_guess(attempts)
+    assert fork.next_guess() == tree.next_guess(fork.attempts())
+    # Attempts leaving the tree, and switching trees
+    session.apply("aback", wordle_engine.feedback("aback", "geese"))
+    assert session.next_guess() is None
+    session.follow(other_tree)
+    assert session.next_guess() is None
+    session.undo()
+    session.undo()
+    assert session.next_guess() == "aside"
+    session.follow(None)
+    assert session.next_guess() is None
+
+
+def test_multi_board():
+    for engine_name in ENGINES:
+        index = small_index(engine_name)
+        answers = ["brisk", "crate", "steak"]
+        boards = wordle_engine.MultiBoardSession(index, len(answers))
+        singles = [wordle_engine.WordleSession(index) for answer in answers]
+        for guess in ("aside", "crate", "stake", "steak", "brisk"):
+            clues_list = [wordle_engine.feedback(guess, answer) for answer in answers]
+            counts = boards.apply(guess, clues_list)
+            for b, single in enumerate(singles):
+                if not boards.solved[b] or boards.solved[b] == boards.depth:
+                    single.apply(guess, clues_list[b])
+                assert counts[b] == single.count()
+                assert boards.boards[b].remaining() == single.remaining()
+        assert boards.solved == [5, 2, 4] and boards.is_solved() and boards.unsolved() == []
+        # Clues for boards already solved are ignored
+        boards.undo()
+        assert boards.solved == [0, 2, 4] and boards.unsolved() == [boards.boards[0]]
+        assert boards.apply("brisk", ["ggggg", "invalid", ""]) == [1, 1, 1]
+        assert boards.undo() == "brisk" and boards.depth == 4
+        try:
+            boards.apply("brisk", ["ggggg", "-----"])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("apply did not fail with too few clue strings")
+        while boards.undo() is not None:
+            pass
+        assert boards.solved == [0, 0, 0] and boards.counts() == [len(SMALL_WORDS)] * 3
+
+
+def test_prefix_cache():
+    for engine_name in ENGINES:
+        index = full_index(engine_name)
+        cache = wordle_engine.PrefixCache()
+        index.cache = cache
+        try:
+            first = wordle_engine.WordleSession(index)
+            first.apply("aside", "-yg--")
+            first.apply("slick", "y-g-g")
+            assert cache.stats() == {"entries": 2, "bytes": cache.nbytes, "hits": 0,
+                "disk_hits": 0, "misses": 2, "evictions": 0, "disk_errors": 0}
+            # A game starting the same way gets the states from the cache
+            second = wordle_engine.WordleSession(index)
+            second.apply("aside", "-yg--")
+            assert second.candidates is first.node[3][0]
+            second.apply("slick", "y-g-g")
+            assert second.remaining() == ["brisk", "frisk", "whisk"]
+            assert cache.hits == 2 and cache.misses == 2
+        finally:
+            index.cache = None
+    # Memory is bounded by the size of the states, least recently used dropped first
+    index = small_index()
+    size = sys.getsizeof(b"x" * 1000) + wordle_engine.PrefixCache.ENTRY_OVERHEAD
+    cache = wordle_engine.PrefixCache(max_bytes=3 * size)
+    for guess in ("aside", "brisk", "frisk"):
+        cache.put(index, ((guess, "-----"),), b"x" * 1000)
+    assert cache.get(index, (("aside", "-----"),)) is not None
+    cache.put(index, (("whisk", "-----"),), b"x" * 1000)
+    assert cache.evictions == 1 and cache.nbytes == 3 * size
+    assert cache.get(index, (("brisk", "-----"),)) is None
+    cache.put(index, (("slick", "-----"),), b"x" * 2000)
+    assert cache.evictions == 3 and len(cache.entries) == 2
+    assert cache.get(index, (("whisk", "-----"),)) is not None
+    # Set states take far more memory than bitset ones
+    sizes = dict()
+    for engine_name in ("bitset", "set"):
+        cache = wordle_engine.PrefixCache()
+        index = full_index(engine_name)
+        cache.put(index, (), index.start)
+        sizes[engine_name] = cache.nbytes
+    assert sizes["set"] > 10 * sizes["bitset"]
+
+
+def test_prefix_cache_disk():
+    attempts = (("aside", "-yg--"),)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        disk_dir = os.path.join(tmp_dir, "states")
+        saved = wordle_engine.PrefixCache(disk_dir=disk_dir, disk_depth=1)
+        bitset_index = full_index("bitset")
+        state = bitset_index.engine.filter(bitset_index.start,
+            wordle_engine.compile_clues("aside", "-yg--", bitset_index.abc))
+        saved.put(bitset_index, attempts, state)
+        # Deeper states are only kept in memory
+        saved.put(bitset_index, attempts + (("slick", "y-g-g"),), bitset_index.start)
+        assert len(os.listdir(disk_dir)) == 1
+        # States on disk can be read by a later cache, with any engine
+        for engine_name in ENGINES:
+            index = full_index(engine_name)
+            cache = wordle_engine.PrefixCache(disk_dir=disk_dir, disk_depth=1)
+            words = index.engine.words(cache.get(index, attempts))
+            assert words == sorted(w for w in index.words
+                if wordle_engine.compile_clues("aside", "-yg--", index.abc).matches(w))
+            assert cache.disk_hits == 1 and cache.misses == 0
+            assert cache.get(index, (("crane", "-----"),)) is None and cache.misses == 1
+        # States that cannot be saved are still kept in memory
+        not_a_dir = os.path.join(tmp_dir, "file")
+        open(not_a_dir, "w").close()
+        cache = wordle_engine.PrefixCache(disk_dir=os.path.join(not_a_dir, "states"))
+        cache.put(bitset_index, attempts, state)
+        assert cache.disk_errors == 1 and cache.get(bitset_index, attempts) is state
+
+
+def test_prefix_cache_disk_files():
+    index = small_index()
+    engine = index.engine
+    openers = [((guess, "-----"),) for guess in ("aside", "brisk", "frisk", "whisk")]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Files already there are removed from the least recently used
+        first = wordle_engine.PrefixCache(disk_dir=tmp_dir, disk_depth=1, disk_max_files=3)
+        for n, attempts in enumerate(openers[:3]):
+            first.put(index, attempts, engine.start())
+            os.utime(os.path.join(tmp_dir, first._disk_name(index, attempts)), (n, n))
+        cache = wordle_engine.PrefixCache(disk_dir=tmp_dir, disk_depth=1, disk_max_files=3)
+        # (A hit marks the file as recently used)
+        assert cache.get(index, openers[0]) is not None and cache.disk_hits == 1
+        cache.put(index, openers[3], engine.start())
+        assert sorted(os.listdir(tmp_dir)) == sorted(cache._disk_name(index, attempts)
+            for attempts in (openers[0], openers[2], openers[3]))
+        cache.put(index, openers[1], engine.start())
+        assert len(os.listdir(tmp_dir)) == 3
+        assert not os.path.exists(os.path.join(tmp_dir, cache._disk_name(index, openers[2])))
+
+
+def test_corpus():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fnames = [os.path.join(tmp_dir, name) for name in ("a.txt", "b.txt")]
+        with open(fnames[0], "w") as f:
+            f.write("# comment\naside brisk\nSLICK ox\n")
+        with open(fnames[1], "w") as f:
+            f.write("crane ñandú\nbrisk\n")
+        corpus = wordle_engine.Corpus({"x": fnames})
+        assert corpus.lengths("x") == []
+        index = corpus.index("x", 5)
+        assert sorted(index.words) == ["aside", "brisk", "crane", "slick", "ñandú"]
+        assert index.abc_str == ABC_STR + "ñú"
+        assert corpus.lengths("x") == [2, 5]
+        # Each length is indexed only once, and only when asked for
+        assert corpus.index("x", 5) is index
+        assert list(corpus.indexes) == [("x", 5)]
+        assert corpus.index("x", 2).words == frozenset(["ox"])
+        for name, wlen, error in (("y", 5, "unknown word list 'y'"),
+                ("x", 3, "no words of length 3 in word list 'x' (lengths: 2, 5)")):
+            try:
+                corpus.index(name, wlen)
+            except ValueError as e:
+                assert str(e) == error
+            else:
+                raise AssertionError("no error for {0} {1}".format(name, wlen))
+
+
+# Queries, with the same condition written as plain python
+QUERIES = {
+    "s?a?e -r e>=2":    lambda w: w[0] == "s" and w[2] == "a" and w[4] == "e"
+                                  and "r" not in w and w.count("e") >= 2,
+    "[aeiou]???[^s]":   lambda w: w[0] in "aeiou" and w[4] != "s",
+    "+ae, e=2":         lambda w: "a" in w and w.count("e") == 2,
+    "..ck. o<1 -s":     lambda w: w[2:4] == "ck" and "o" not in w and "s" not in w,
+    "z>1":              lambda w: w.count("z") > 1,
+    "????? -aeiou -y":  lambda w: not set(w) & set("aeiouy"),
+}
+
+BAD_QUERIES = [
+    "s?a?",             # Too few slots
+    "s?a?e?",           # Too many slots
+    "s?a?e c?a?e",      # Two patterns
+    "[ae????",          # Missing ']'
+    "[a1]????",         # Invalid letter in brackets
+    "s?a?1",            # Invalid character
+    "e>=x",             # Count is not a number
+    "ee>=2",            # More than one letter
+    "e<0",              # No word has fewer than 0 e's
+    "-",                # No letters
+    "+a1",              # Invalid letter
+]
+
+
+def test_query():
+    for engine_name in ENGINES:
+        index = full_index(engine_name)
+        for text, condition in QUERIES.items():
+            expected = sorted(w for w in index.words if condition(w))
+            count, words = index.query(text)
+            assert (count, words) == (len(expected), expected), (engine_name, text)
+            # Only the first words in alphabetical order, but counting all of them
+            assert index.query(text, 3) == (len(expected), expected[0:3]), (engine_name, text)
+
+
+def test_query_errors():
+    index = full_index("bitset")
+    for text in BAD_QUERIES:
+        try:
+            index.query(text)
+        except ValueError:
+            continue
+        raise AssertionError("query '" + text + "' did not fail")
+
+
+def test_letter_stats():
+    for engine_name in ENGINES:
+        index = full_index(engine_name)
+        engine = index.engine
+        session = wordle_engine.WordleSession(index)
+        stats = wordle_engine.LetterStats(engine, session.candidates)
+        for guess, clues in (("aside", "-yg--"), ("crony", "--y--"), ("undo", None),
+                ("slick", "y-g-g"), ("undo", None), ("undo", None)):
+            if guess == "undo":
+                session.undo()
+            else:
+                session.apply(guess, clues)
+            stats.update(session.candidates)
+            words = session.remaining()
+            # Same counts as those of the words remaining counted again
+            for i, slot in enumerate(stats.counts):
+                counted = dict()
+                for w in words:
+                    counted[w[i]] = counted.get(w[i], 0) + 1
+                assert dict((k, v) for k, v in slot.items() if v) == counted
+            score = lambda w: sum(sum(1 for o in words if o[i] == ltr) for i, ltr in enumerate(w))
+            if len(words) <= 500:
+                expected = sorted(words, key=lambda w: (-score(w), w))
+                assert stats.ranked() == expected and stats.ranked(5) == expected[0:5]
+            else:
+                assert stats.ranked(5) == stats.ranked()[0:5]
+
+
+if __name__ == '__main__':
+    sys.exit(wordle_testing.run_tests(globals()))
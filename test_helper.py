@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+# SPDX-License-Identifier: MIT
+
+"""
+test_helper.py
+Created    : 2026.10.18
+
+This program tests the modes of wordle-helper.py built on top of its
+library (wordle_simulate.py for --simulate, wordle_verify.py for
+--verify, and the helper itself.)
+
+Run it from this directory, either as a script, exiting with 1 if
+any test fails, or with pytest.
+
+"""
+
+import io
+import json
+import marshal
+import os
+import pstats
+import sys
+import tempfile
+
+import wordle_engine
+import wordle_profile
+import wordle_simulate
+import wordle_verify
+from wordle_testing import ABC_STR, ENGINES, HERE, SMALL_WORDS, run_helper, small_index
+import wordle_testing
+
+
+def test_simulate_games():
+    # Every word played once, each game in the guesses play_game needs
+    expected = dict()
+    engine = wordle_engine.make_engine("bitset", SMALL_WORDS, ABC_STR)
+    for answer in SMALL_WORDS:
+        expected[answer] = wordle_simulate.play_game(engine, ABC_STR, answer, "first")
+    assert expected["abaca"] == 1 and expected["aback"] == 2
+    assert all(n <= wordle_simulate.GIVE_UP for n in expected.values())
+    for engine_name in ENGINES:
+        for nworkers in (1, 2):
+            played = dict()
+            for results in wordle_simulate.simulate_games(SMALL_WORDS, ABC_STR, engine_name,
+                    "first", nworkers):
+                for answer, nguesses, seconds in results:
+                    assert answer not in played and seconds >= 0
+                    played[answer] = nguesses
+            assert played == expected, (engine_name, nworkers)
+    # Other strategies pick among the remaining candidates, always solving
+    for strategy in ("entropy", "size"):
+        for answer in SMALL_WORDS:
+            nguesses = wordle_simulate.play_game(engine, ABC_STR, answer, strategy, "crane")
+            assert nguesses <= len(SMALL_WORDS), (strategy, answer)
+        assert wordle_simulate.play_game(engine, ABC_STR, "crane", strategy, "crane") == 1
+
+
+def test_read_games():
+    helper = wordle_testing.helper_module()
+    lines = ['{"id": "g1", "attempts": [["aside", "-yg--"], ["slick", "y-g-g"]]}',
+             "", "# comment", "aside -yg-- slick y-g-g", "aside -yg-- slick",
+             '{"id": 3, "attempts"', '{"guesses": 1}', '{"attempts": []}']
+    assert list(helper.read_games(lines)) == [
+        ("g1", [["aside", "-yg--"], ["slick", "y-g-g"]]),
+        (4, [("aside", "-yg--"), ("slick", "y-g-g")]),
+        (5, None), (6, None), (7, None), (8, [])]
+
+
+def test_stream_batch():
+    games = ['{"id": "g1", "attempts": [["aside", "-yg--"], ["slick", "y-g-g"]]}',
+             "ASIDE -YG-- SLICK Y-G-G",
+             '{"id": 3, "attempts": [["aside", "-yg"]]}',
+             '{"id": 4, "attempts": [["as1de", "-yg--"]]}',
+             '{"id": 5, "attempts": "aside"}',
+             '{"id": 6, "attempts": []}']
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fname = os.path.join(tmp_dir, "games.txt")
+        with open(fname, "w") as f:
+            f.write("\n".join(games) + "\n")
+        for options in ([], ["--cache"], ["-eset"]):
+            code, out, err = run_helper(["-n5", "-B" + fname] + options)
+            assert code == 0, err
+            results = [json.loads(line) for line in out.splitlines()]
+            assert results[:2] == [
+                {"id": "g1", "attempts": 2, "remaining": 3, "words": ["brisk", "frisk", "whisk"]},
+                {"id": 2, "attempts": 2, "remaining": 3, "words": ["brisk", "frisk", "whisk"]}]
+            assert results[2:5] == [
+                {"id": 3, "error": "attempt 1 is not 5 characters long"},
+                {"id": 4, "error": "invalid character in attempt 1"},
+                {"id": 5, "error": "invalid game record"}]
+            # With no attempts all words remain, too many to be listed
+            assert results[5]["remaining"] > 5 and "words" not in results[5]
+            assert ("Prefix cache: " in err) == ("--cache" in options)
+
+
+def test_json_records():
+    batch = ["-n500", "-b" + os.path.join(HERE, "input_test_en_01.txt")]
+    code, out, err = run_helper(["--quiet"] + batch)
+    assert code == 0 and err == ""
+    records = [json.loads(line) for line in out.splitlines()]
+    assert [r["attempt"] for r in records] == [1, 2, 3]
+    assert [(r["guess"], r["clues"], r["known"]) for r in records] == \
+        [("aside", "---g-", True), ("young", "yg---", False), ("moody", "-g-gg", True)]
+    before = len(wordle_testing.full_index().words)
+    for r in records:
+        assert list(r) == ["attempt", "guess", "clues", "known", "before", "constraint",
+            "steps", "remaining", "words"]
+        assert list(r["constraint"]) == ["rules", "fixed", "banned", "min", "max"]
+        assert r["before"] == before
+        assert r["steps"][-1]["remaining"] == r["remaining"] == len(r["words"])
+        before = r["remaining"]
+    assert "howdy" in records[-1]["words"] and "hoody" not in records[-1]["words"]
+    assert records[0]["constraint"]["fixed"] == {"3": "d"}
+    assert records[0]["constraint"]["max"] == {"a": 0, "s": 0, "i": 0, "e": 0}
+    # Same records with every engine (words unsorted), other messages on stderr
+    for engine_name in ENGINES:
+        code, out2, err = run_helper(["--json", "-e" + engine_name] + batch)
+        assert code == 0 and "Size of starting word list" in err
+        records2 = [json.loads(line) for line in out2.splitlines()]
+        for r in records + records2:
+            r["words"] = sorted(r["words"])
+        assert records2 == records, engine_name
+
+
+def test_undo_attempt():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fname = os.path.join(tmp_dir, "batch.txt")
+        with open(fname, "w") as f:
+            f.write("crane\n-----\n<\naside\n-yg--\nslick\ny-g-g\n")
+        code, out, err = run_helper(["--quiet", "-n3", "-b" + fname])
+    assert code == 0
+    records = [json.loads(line) for line in out.splitlines()]
+    nwords = len(wordle_testing.full_index().words)
+    assert records[1] == {"undo": 1, "guess": "crane", "clues": "-----", "remaining": nwords}
+    assert [r.get("attempt") for r in records] == [1, None, 1, 2]
+    assert records[2]["before"] == nwords
+    assert sorted(records[3]["words"]) == ["brisk", "frisk", "whisk"]
+
+
+def test_speculation():
+    helper = wordle_testing.helper_module()
+    index = small_index()
+    helper.index, helper.engine = index, index.engine
+    helper.word_set, helper.abc_str, helper.abc = set(SMALL_WORDS), ABC_STR, index.abc
+    helper.suggest_n = 5
+    engine = index.engine
+    start = index.start
+    speculation = helper.Speculation("crane", start)
+    speculation.thread.join()
+    # Every clue pattern crane can get was worked out, and ranked if needed
+    patterns = set(wordle_engine.feedback("crane", w) for w in SMALL_WORDS)
+    assert set(speculation.results) == patterns
+    for clues in patterns:
+        cons = wordle_engine.compile_clues("crane", clues, index.abc)
+        filtered, ranking = speculation.take("crane", start, clues)
+        assert filtered == engine.filter_steps(start, cons)
+        remaining = engine.words(filtered[0])
+        if len(remaining) > 1:
+            assert ranking == wordle_engine.rank_guesses(SMALL_WORDS, remaining, ABC_STR,
+                "entropy", 1)
+        else:
+            assert ranking is None
+    # Nothing is taken for another guess or other candidates
+    assert speculation.take("trace", start, "-----") == (None, None)
+    assert speculation.take("crane", engine.minus(start, start), "-----") == (None, None)
+    # Taking the results stops the thread
+    speculation = helper.Speculation("aside", start)
+    speculation.take("aside", start, "-----")
+    assert speculation.stop.is_set() and not speculation.thread.is_alive()
+
+
+def test_feedback_partition():
+    index = wordle_engine.BitsetEngine(SMALL_WORDS, ABC_STR)
+    for guess in SMALL_WORDS + ["eeeee", "sassy"]:
+        partition = wordle_verify.feedback_partition(index, guess)
+        for clues, state in partition.items():
+            assert state != 0
+            assert all(wordle_engine.feedback(guess, w) == clues for w in index.words(state))
+        assert sum(state.bit_count() for state in partition.values()) == len(SMALL_WORDS)
+    assert wordle_verify.signature("geese", "-yg-g", "eerie") == \
+        "guess repeats ygg, word repeats"
+    assert wordle_verify.signature("crane", "-----", "aside") == "no repeats in guess"
+
+
+def test_verify_chunks():
+    results = dict()
+    for engine_name in ENGINES:
+        for nworkers in (1, 2):
+            nguesses = npairs = 0
+            found = {"dropped": dict(), "kept": dict()}
+            for chunk in wordle_verify.verify_chunks(SMALL_WORDS, ABC_STR, engine_name, nworkers):
+                nguesses += chunk[0]
+                npairs += chunk[1]
+                for kind, groups in chunk[2].items():
+                    found[kind].update(groups)
+            assert (nguesses, npairs) == (len(SMALL_WORDS), len(SMALL_WORDS) ** 2)
+            results[(engine_name, nworkers)] = found
+    found = results[("bitset", 1)]
+    assert all(other == found for other in results.values())
+    # The solution is never filtered out, but words with other clues can be kept
+    assert found["dropped"] == dict()
+    assert len(found["kept"]) > 0
+    for sig, (count, (guess, clues, word)) in found["kept"].items():
+        assert wordle_engine.feedback(guess, word) != clues
+        assert wordle_engine.compile_clues(guess, clues, frozenset(ABC_STR)).matches(word)
+        assert wordle_verify.signature(guess, clues, word) == sig
+
+
+def test_profiler():
+    rules = {"Ge2  :  Keep": "G", "Yd0  :  Discard": "Y", "YRe12:  Discard": "YR",
+             "-Ro2 :  Discard": "-R", "-g*  :  Discard": "-*"}
+    for rule, kind in rules.items():
+        assert wordle_profile.rule_kind(rule) == kind
+    index = wordle_testing.full_index()
+    engine = index.engine
+    profiler = wordle_profile.Profiler()
+    hooked = []
+    profiler.add_hook(lambda *record: hooked.append(record))
+    # Filtering one step at a time gives the same results
+    cons = wordle_engine.compile_clues("geese", "-yg-y", index.abc)
+    mark = profiler.start()
+    state, remaining = profiler.filter_steps(engine, index.start, cons)
+    profiler.stop("filter", mark, engine.count(index.start), engine.count(state))
+    assert (state, remaining) == engine.filter_steps(index.start, cons)
+    rule_stats = dict((name, calls) for name, calls, *rest
+        in profiler.entries("rule", wordle_profile.RULE_KINDS))
+    # (Steps from the same rule count as a single call of it)
+    assert rule_stats == {"G": 1, "YR": 2, "-*": 2}
+    assert [r[:2] for r in hooked] == [("rule", "G"), ("rule", "YR"), ("rule", "YR"),
+        ("rule", "-*"), ("rule", "-*"), ("rule", "YR"), ("rule", "YR"), ("phase", "filter")]
+    assert hooked[-1][3:5] == (len(index.words), engine.count(state))
+    # Bytes printed are counted as utf-8, and recorded for a phase or rule
+    out = io.StringIO()
+    stream = profiler.wrap(out)
+    mark = profiler.start()
+    profiler.mark()
+    stream.write("ñandú\n")
+    profiler.printed_for("Ge2  :  Keep")
+    profiler.stop("output", mark)
+    assert out.getvalue() == "ñandú\n" and profiler.nbytes == 8
+    assert profiler.stats[("phase", "output")][4] == 8
+    assert profiler.stats[("rule", "G")][4] == 8
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fname = os.path.join(tmp_dir, "profile.json")
+        profiler.save(fname)
+        with open(fname) as f:
+            saved = json.load(f)
+        assert list(saved["phases"]) == ["filter", "output"]
+        assert saved["rules"]["YR"]["calls"] == 2
+        # Stats as written by cProfile, readable with pstats
+        fname = os.path.join(tmp_dir, "profile.prof")
+        profiler.save(fname)
+        stats = pstats.Stats(fname).stats
+        assert (wordle_profile.STATS_FILE, 0, "rule YR") in stats
+        assert stats[(wordle_profile.STATS_FILE, 0, "phase filter")][0] == 1
+
+
+def test_profile_option():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fname = os.path.join(tmp_dir, "profile.json")
+        code, out, err = run_helper(["--profile=" + fname,
+            "-b" + os.path.join(HERE, "input_test_en_01.txt")])
+        assert code == 0 and "Profile saved in" in err
+        with open(fname) as f:
+            saved = json.load(f)
+    phases = saved["phases"]
+    assert phases["load"]["out"] == len(wordle_testing.full_index().words)
+    assert phases["filter"]["calls"] == 3
+    # Every byte printed after loading is counted in some phase
+    assert sum(p["bytes"] for p in phases.values()) <= len(out.encode("utf-8"))
+    assert phases["output"]["bytes"] > 0 and "G" in saved["rules"]
+
+
+if __name__ == '__main__':
+    sys.exit(wordle_testing.run_tests(globals()))
@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# SPDX-License-Identifier: MIT
+
+"""
+test_server.py
+Created    : 2026.10.18
+
+This program tests the responses of the server of wordle-helper.py
+(wordle_server.py, option --serve) to valid and malformed requests,
+and that a bad request never drops the client's connection.
+
+Run it from this directory, either as a script, exiting with 1 if
+any test fails, or with pytest.
+
+"""
+
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+
+import wordle_server
+import wordle_testing
+
+
+# Malformed requests, with the start of the error each one gets
+MALFORMED = [
+    ([1, 2],                                            "request must be a JSON object"),
+    ("crane",                                           "request must be a JSON object"),
+    ({"guess": "crane", "clues": "-----"},              "missing 'session'"),
+    ({"session": [1], "guess": "crane"},                "'session' must be a string or an integer"),
+    ({"session": {"a": 1}, "op": "end"},                "'session' must be a string or an integer"),
+    ({"session": "s", "list": "/etc/passwd"},           "unknown word list '/etc/passwd'"),
+    ({"session": "s", "list": "words_len5_en.txt"},     "unknown word list 'words_len5_en.txt'"),
+    ({"session": "s", "list": ["en"]},                  "'list' must be a string"),
+    ({"session": "s", "wlen": 0},                       "invalid 'wlen'"),
+    ({"session": "s", "wlen": "5"},                     "invalid 'wlen'"),
+    ({"session": "s", "wlen": 9},                       "no words of length 9 in word list 'en' (lengths: 5, 7)"),
+    ({"session": "s", "guess": "cranes", "clues": "-----"}, "guess 'cranes' is not 5 characters long"),
+    ({"session": "s", "guess": "crane", "clues": "--x--"},  "invalid character in clues '--x--'"),
+    ({"session": "s", "guess": 12345, "clues": "-----"},    "invalid character in guess '12345'"),
+    ({"session": "s", "op": "redo"},                    "unknown op 'redo'"),
+    ({"op": "query", "query": "s?a?"},                  "pattern 's?a?' does not have 5 slots"),
+    ({"op": "query", "query": "s?a?e", "max": -1},      "invalid 'max'"),
+    ({"op": "query", "query": "s?a?e", "list": "../en"}, "unknown word list '../en'"),
+]
+
+
+def test_malformed_requests():
+    server = wordle_server.WordleServer()
+    for req, error in MALFORMED:
+        resp = server.handle_request(req)
+        assert resp.get("error", "").startswith(error), (req, resp)
+    # Sessions are created by valid requests, but never left with a bad attempt
+    assert list(server.sessions) == ["s"]
+    assert server.handle_request({"session": "s", "op": "undo"})["attempt"] == 0
+
+
+def test_sessions():
+    server = wordle_server.WordleServer(show_max_n=3)
+    resp = server.handle_request({"session": "s1", "guess": "aside", "clues": "-yg--"})
+    assert resp == {"session": "s1", "attempt": 1, "remaining": resp["remaining"]}
+    assert resp["remaining"] > 3
+    resp = server.handle_request({"session": "s1", "guess": "slick", "clues": "y-g-g"})
+    assert resp == {"session": "s1", "attempt": 2, "remaining": 3,
+        "words": ["brisk", "frisk", "whisk"]}
+    # Sessions with other ids (of any type) are separate games
+    resp = server.handle_request({"session": 1, "guess": "crane", "clues": "-----"})
+    assert resp["attempt"] == 1 and resp["remaining"] > 3
+    resp = server.handle_request({"session": "s1", "op": "undo", "max": 0})
+    assert resp == {"session": "s1", "attempt": 1, "remaining": resp["remaining"]}
+    resp = server.handle_request({"session": "s1", "op": "reset"})
+    assert resp["attempt"] == 0
+    assert server.handle_request({"session": "s1", "op": "end"}) == {"session": "s1", "ended": True}
+    assert list(server.sessions) == [1]
+
+
+def test_word_lengths():
+    server = wordle_server.WordleServer()
+    # Words of other lengths, from the files of the same language
+    resp = server.handle_request({"session": "s7", "wlen": 7, "guess": "natural",
+        "clues": "yg-----"})
+    assert resp["attempt"] == 1 and resp["remaining"] > 0
+    resp = server.handle_request({"session": "s5", "guess": "natural", "clues": "yg-----"})
+    assert resp["error"] == "guess 'natural' is not 5 characters long"
+    assert server.corpus.lengths("en") == [5, 7] and server.corpus.lengths("es") == []
+
+
+def test_wordlist_files():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        wordlist = os.path.join(tmp_dir, "words.txt")
+        shutil.copy(os.path.join(wordle_testing.HERE, "words_len5_es.txt"), wordlist)
+        # The list given with -w can be used, but no other file
+        server = wordle_server.WordleServer(default_list=wordlist)
+        resp = server.handle_request({"session": "s", "list": wordlist, "guess": "nacer",
+            "clues": "-y--y"})
+        assert resp["remaining"] > 0, resp
+        resp = server.handle_request({"session": "t", "list": os.path.join(tmp_dir, "other.txt")})
+        assert resp["error"].startswith("unknown word list")
+        # Requests never write caches of the word lists
+        assert os.listdir(tmp_dir) == ["words.txt"]
+
+
+def test_client_connection():
+    server = wordle_server.WordleServer()
+    handle_request = server.handle_request
+
+    def failing_handle_request(req):
+        if isinstance(req, dict) and req.get("op") == "fail":
+            raise RuntimeError("unexpected failure")
+        return handle_request(req)
+
+    server.handle_request = failing_handle_request
+    lines = [b"not json\n", b"\n", b'{"session": ["s"]}\n', b'{"op": "fail"}\n',
+        b'{"session": "s", "guess": "aside", "clues": "-yg--"}\n']
+
+    async def run(path):
+        listener = await asyncio.start_unix_server(server.handle_client, path)
+        async with listener:
+            reader, writer = await asyncio.open_unix_connection(path)
+            responses = []
+            for line in lines:
+                writer.write(line)
+                await writer.drain()
+                if line.strip():
+                    responses.append(json.loads(await reader.readline()))
+            writer.close()
+            await writer.wait_closed()
+            return responses
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        responses = asyncio.run(run(os.path.join(tmp_dir, "server.sock")))
+    assert responses[0]["error"].startswith("invalid JSON")
+    assert responses[1] == {"error": "'session' must be a string or an integer"}
+    assert responses[2] == {"error": "unexpected failure"}
+    # The connection was kept through all of the errors
+    assert responses[3]["attempt"] == 1 and responses[3]["remaining"] > 0
+
+
+def test_query_requests():
+    server = wordle_server.WordleServer(show_max_n=2)
+    resp = server.handle_request({"op": "query", "query": "s?a?e -r e>=2"})
+    assert resp["count"] > 2 and len(resp["words"]) == 2
+    assert resp["words"] == sorted(resp["words"])
+    resp = server.handle_request({"op": "query", "query": "n?t?r?l", "wlen": 7, "max": 10})
+    assert resp == {"query": "n?t?r?l", "count": 1, "words": ["natural"]}
+
+
+if __name__ == '__main__':
+    sys.exit(wordle_testing.run_tests(globals()))
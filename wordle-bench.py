@@ -0,0 +1,299 @@
+#!/usr/bin/env python
+# SPDX-License-Identifier: MIT
+
+"""
+wordle-bench.py
+Created    : 2026.10.18
+
+Performance benchmarks for wordle-helper.py, with baselines saved to
+JSON and a compare mode for catching regressions of the hot paths:
+
+    load:LIST      : load_wordlist() of each shipped list (en, es, len7)
+    attempt:LIST   : a single process_attempt() on each shipped list,
+                     filtering and printing included
+    batch:FILE     : a whole batch game (-bFILE) for each input_*.txt
+                     file, in-process with a fresh copy of the module
+    bash:FILE      : the bash and python scripts as separate processes,
+    python:FILE      for each of input_en.txt and input_es.txt
+
+Every benchmark is run once as a warm-up and then timed repeatedly
+(with the garbage collector off, as timeit does), reporting the min,
+median, mean and standard deviation of the runs in milliseconds.
+Medians are what is compared against a baseline. The bash script does
+not count as a hot path of this repo, so only the python side of the
+bash-vs-python comparison can fail a comparison.
+
+Usage:
+  ./wordle-bench.py [-rN] [-kTEXT] [--no-bash] [--save[=FILE]]
+                    [--compare[=FILE]] [--threshold=P]
+
+    -rN            : time N runs of each benchmark (default 7, and at
+                     most 3 for the runs of separate processes)
+    -kTEXT         : run only benchmarks with TEXT in their name
+    --no-bash      : skip the bash-vs-python comparison
+    --save[=FILE]  : save the results as the baseline (by default in
+                     .wordle-cache/bench_baseline.json)
+    --compare[=FILE] : compare with the baseline, exiting with 1 if the
+                     median of any hot path regressed past the threshold
+    --threshold=P  : percentage of slowdown counted as a regression
+                     (default 20)
+
+"""
+
+import contextlib
+import gc
+import glob
+import importlib.util
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+HELPER_PY       = "wordle-helper.py"
+HELPER_SH       = "./wordle-helper.sh"
+BASELINE_FILE   = os.path.join(".wordle-cache", "bench_baseline.json")
+REPEAT          = 7
+REPEAT_PROCESS  = 3
+THRESHOLD       = 20.0
+MIN_DIFF_MS     = 0.1       # Differences below this are just noise
+
+# Options, and a guess with its clues leaving a few words, for each list
+LISTS = {
+    "en":   ([], "aside", "-yg--"),
+    "es":   (["-s"], "nacer", "-y--y"),
+    "len7": (["-wwords_len7_en.txt", "-l7"], "natural", "yg-----"),
+}
+BASH_INPUTS = {
+    "input_en.txt": [],
+    "input_es.txt": ["-s"],
+}
+
+
+def fresh_helper():
+    """A fresh copy of the helper's module, with all its globals at their defaults."""
+    spec = importlib.util.spec_from_file_location("wordle_helper_bench", HELPER_PY)
+    helper = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stdout(io.StringIO()):
+        spec.loader.exec_module(helper)
+    return helper
+
+
+def case_options(fname):
+    """Options given in a "# test-options:" comment of fname, as used by wordle-tester.py."""
+    options = []
+    with open(fname) as lines:
+        for line in lines:
+            line = line.strip()
+            if line.startswith("# test-options:"):
+                options.extend(line.split(":", 1)[1].split())
+    return options
+
+
+def bench_load(options):
+    helper = fresh_helper()
+    with contextlib.redirect_stdout(io.StringIO()):
+        helper.process_options(options)
+    def run():
+        helper.load_wordlist()
+    return None, run
+
+
+def bench_attempt(options, guess, clues):
+    helper = fresh_helper()
+    with contextlib.redirect_stdout(io.StringIO()):
+        helper.process_options(options)
+        helper.load_wordlist()
+    def prepare():
+        helper.session = helper.wordle_engine.WordleSession(helper.index)
+    def run():
+        helper.process_attempt(1, guess, clues)
+    return prepare, run
+
+
+def bench_batch(fname):
+    argv = case_options(fname) + ["-b" + fname]
+    def run():
+        helper = fresh_helper()
+        try:
+            helper.do_wordle_helper(argv)
+        except SystemExit:
+            pass
+    return None, run
+
+
+def bench_process(command):
+    def run():
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return None, run
+
+
+def benchmarks(with_bash):
+    """
+    List of (name, make, repeat, gated), with make() returning the
+    (prepare, run) functions of the benchmark.
+    """
+    found = []
+    for name, (options, guess, clues) in LISTS.items():
+        found.append(("load:" + name, lambda o=options: bench_load(o), REPEAT, True))
+    for name, (options, guess, clues) in LISTS.items():
+        found.append(("attempt:" + name,
+            lambda o=options, g=guess, c=clues: bench_attempt(o, g, c), REPEAT, True))
+    for fname in sorted(glob.glob("input_*.txt")):
+        found.append(("batch:" + fname, lambda f=fname: bench_batch(f), REPEAT, True))
+    if with_bash:
+        for fname, options in BASH_INPUTS.items():
+            args = options + ["-b" + fname]
+            found.append(("bash:" + fname,
+                lambda a=args: bench_process([HELPER_SH] + a), REPEAT_PROCESS, False))
+            found.append(("python:" + fname,
+                lambda a=args: bench_process([sys.executable, HELPER_PY] + a), REPEAT_PROCESS, True))
+    return found
+
+
+def time_runs(prepare, run, repeat):
+    """Milliseconds taken by each of repeat runs, after a warm-up one."""
+    times = []
+    for i in range(repeat + 1):
+        if prepare is not None:
+            prepare()
+        gc_was_on = gc.isenabled()
+        gc.disable()
+        output = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(output):
+                start = time.perf_counter()
+                run()
+                elapsed = time.perf_counter() - start
+        finally:
+            if gc_was_on:
+                gc.enable()
+        if i > 0:
+            times.append(1000 * elapsed)
+    return times
+
+
+def summary(times, gated):
+    return {
+        "runs":   [round(t, 3) for t in times],
+        "min":    round(min(times), 3),
+        "median": round(statistics.median(times), 3),
+        "mean":   round(statistics.mean(times), 3),
+        "stdev":  round(statistics.stdev(times), 3) if len(times) > 1 else 0.0,
+        "gated":  gated,
+    }
+
+
+def load_baseline(fname):
+    try:
+        with open(fname) as f:
+            return json.load(f)["results"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_baseline(fname, results, repeat):
+    os.makedirs(os.path.dirname(fname) or ".", exist_ok=True)
+    baseline = {
+        "created":  time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python":   platform.python_version(),
+        "platform": platform.platform(),
+        "repeat":   repeat,
+        "results":  results,
+    }
+    with open(fname, "w") as f:
+        json.dump(baseline, f, indent=1, sort_keys=True)
+
+
+def compare(results, baseline, threshold):
+    """Print the change of each median against the baseline, returning the number of regressions."""
+    print("\nCompared with the baseline (medians, regression past {0:.0f}%):".format(threshold))
+    nregressed = 0
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            print("\t{0:<28} {1:>10.3f} ms  (not in baseline)".format(name, result["median"]))
+            continue
+        change = 100 * (result["median"] - base["median"]) / base["median"]
+        note = ""
+        if change > threshold and result["median"] - base["median"] > MIN_DIFF_MS:
+            if result["gated"]:
+                note = "  REGRESSION"
+                nregressed += 1
+            else:
+                note = "  slower (not a hot path)"
+        print("\t{0:<28} {1:>10.3f} ms  vs {2:>10.3f} ms  {3:>+7.1f}%{4}".format(
+            name, result["median"], base["median"], change, note))
+    return nregressed
+
+
+def main(argv):
+    repeat = REPEAT
+    select = ""
+    with_bash = True
+    save_file = ""
+    compare_file = ""
+    threshold = THRESHOLD
+    for opt in argv:
+        if opt.startswith("-r") and opt[2:].isdecimal() and int(opt[2:]) >= 1:
+            repeat = int(opt[2:])
+        elif opt.startswith("-k"):
+            select = opt[2:]
+        elif opt == "--no-bash":
+            with_bash = False
+        elif opt == "--save" or opt.startswith("--save="):
+            save_file = opt[7:] or BASELINE_FILE
+        elif opt == "--compare" or opt.startswith("--compare="):
+            compare_file = opt[10:] or BASELINE_FILE
+        elif opt.startswith("--threshold="):
+            try:
+                threshold = float(opt[12:])
+            except ValueError:
+                threshold = -1.0
+            if not threshold >= 0:
+                print("Invalid parameter for --threshold: '{0}'".format(opt[12:]))
+                print(__doc__.split("Usage:")[1].rstrip())
+                return 2
+        else:
+            print(__doc__.split("Usage:")[1].rstrip())
+            return 2
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    baseline = None
+    if compare_file != "":
+        baseline = load_baseline(compare_file)
+        if baseline is None:
+            print("ERROR: No baseline found in '" + compare_file + "', save one first with --save")
+            return 2
+    print("{0:<28} {1:>10} {2:>10} {3:>10} {4:>10}  (ms)".format(
+        "Benchmark", "min", "median", "mean", "stdev"))
+    results = dict()
+    for name, make, runs, gated in benchmarks(with_bash):
+        if select not in name:
+            continue
+        prepare, run = make()
+        result = summary(time_runs(prepare, run, min(repeat, runs)), gated)
+        results[name] = result
+        print("{0:<28} {1:>10.3f} {2:>10.3f} {3:>10.3f} {4:>10.3f}".format(name,
+            result["min"], result["median"], result["mean"], result["stdev"]), flush=True)
+    for fname in BASH_INPUTS:
+        bash, python = results.get("bash:" + fname), results.get("python:" + fname)
+        if bash is not None and python is not None:
+            print("Python script is {0:.1f} times faster than the bash one for {1}".format(
+                bash["median"] / python["median"], fname))
+    if save_file != "":
+        save_baseline(save_file, results, repeat)
+        print("Saved these results as baseline in " + save_file)
+    if baseline is not None:
+        nregressed = compare(results, baseline, threshold)
+        if nregressed > 0:
+            print("{0} hot paths regressed past {1:.0f}%".format(nregressed, threshold))
+            return 1
+        print("No hot path regressed past {0:.0f}%".format(threshold))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -21,24 +21,113 @@ to match exactly how this python version runs.)
 
 import sys
 import string
-import re
+import json
+import atexit
+import os
+import threading
 from pathlib import Path
+import wordle_engine
 
 BAR             = '='*48
 abc_str         = string.ascii_lowercase
 abc             = set(abc_str)
 valid_clues     = set("gy-")
 wordlist_file   = ""
+language        = "en"
 word_set        = set()
 show_max_n      = 100
-anything        = "."*5
 batch_mode      = False
 binputs         = []
 binput_index    = 0
 wc_msg          = "Size of starting word list:"
 wlen            = 5
-KEEP            = True
-DISCARD         = False
+engine_name     = "bitset"
+engine          = None
+index           = None
+session         = None
+UNDO            = "<"
+STOP_TIMEOUT    = 1.0           # Seconds to wait for a speculation thread to stop
+use_fbmatrix    = False
+fbmatrix        = None
+suggest_n       = 0
+suggest_metric  = "entropy"
+serve_address   = ""
+simulate_strategy = ""
+verify_mode     = False
+nworkers        = None
+stream_file     = ""
+records_out     = sys.stdout
+json_mode       = False
+json_records    = []
+tree_opener     = ""
+dtree           = None
+nboards         = 1
+boards          = None
+cache_mb        = 0
+cache_disk      = False
+prefix_cache    = None
+profile_file    = ""
+profiler        = None
+query_mode      = False
+query_text      = ""
+rank_words      = False
+letter_stats    = None
+
+class Speculation:
+    """
+    Work done on a background thread while the user reads the board
+    and types in the clues for a guess: the words remaining after each
+    clue pattern the guess can get against the current candidates,
+    likeliest patterns first, and then (with -g/-G) the suggestions for
+    each of them. Only the results for the clues actually entered are
+    used, the rest are discarded.
+    """
+
+    def __init__(self, guess, candidates):
+        self.guess = guess
+        self.candidates = candidates
+        self.results = dict()
+        self.rankings = dict()
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        groups = dict()
+        for w in engine.words(self.candidates, ordered=False):
+            clues = wordle_engine.feedback(self.guess, w)
+            groups[clues] = groups.get(clues, 0) + 1
+        patterns = sorted(groups, key=lambda clues: -groups[clues])
+        for clues in patterns:
+            if self.stop.is_set():
+                return
+            cons = wordle_engine.compile_clues(self.guess, clues, abc)
+            self.results[clues] = engine.filter_steps(self.candidates, cons)
+        if suggest_n <= 0:
+            return
+        for clues in patterns:
+            if self.stop.is_set():
+                return
+            candidates = self.results[clues][0]
+            if engine.count(candidates) > 1:
+                ranking = wordle_engine.rank_guesses(word_set, engine.words(candidates),
+                    abc_str, suggest_metric, 1, fbmatrix, self.stop)
+                if ranking is not None:
+                    self.rankings[clues] = ranking
+
+    def take(self, guess, candidates, clues):
+        """
+        Stop the thread, returning the (candidates, remaining) and the
+        ranking precomputed for clues, each None if not ready (or if the
+        guess and candidates are not the ones speculated on.) The thread
+        checks for the stop between filterings, so it is waited for only
+        briefly, for it not to keep using the engine in the background.
+        """
+        self.stop.set()
+        self.thread.join(STOP_TIMEOUT)
+        if guess != self.guess or candidates is not self.candidates:
+            return None, None
+        return self.results.get(clues), self.rankings.get(clues)
 
 def starting_banner():
     print(BAR)
@@ -48,11 +137,31 @@ def starting_banner():
 
 def process_options(argv):
     global wordlist_file
+    global language
     global show_max_n
     global batch_mode
     global binputs
     global wlen
-    global anything
+    global engine_name
+    global use_fbmatrix
+    global suggest_n
+    global suggest_metric
+    global serve_address
+    global simulate_strategy
+    global verify_mode
+    global nworkers
+    global stream_file
+    global json_mode
+    global tree_opener
+    global nboards
+    global cache_mb
+    global cache_disk
+    global profile_file
+    global profiler
+    global query_mode
+    global query_text
+    global rank_words
+    engine_given = False
     for opt in argv:
         if opt == "-h":
             # Display help
@@ -64,6 +173,7 @@ def process_options(argv):
             # Use Spanish word list
             print("Using the default wordlist for SPANISH")
             wordlist_file="words_len5_es.txt"
+            language = "es"
             continue
         if opt.startswith("-n"):
             # Set maximum number of words to show
@@ -74,6 +184,11 @@ def process_options(argv):
                 print("Invalid max parameter: '{0}'".format(n))
             print("Using {0} as maximum number of words to display".format(show_max_n))
             continue
+        if opt == "-r":
+            # Rank remaining words by positional letter frequency
+            print("Ranking remaining words by positional letter frequency")
+            rank_words = True
+            continue
         if opt.startswith("-b"):
             fname = opt[2:]
             vpath = Path(fname)
@@ -91,11 +206,22 @@ def process_options(argv):
                 print("ERROR: File '"+fname+"' not found, exiting.")
                 sys.exit(-1)
             continue
+        if opt.startswith("-B"):
+            # Streaming batch mode, many games from FILE (or - for stdin)
+            fname = opt[2:]
+            if fname != "-" and not Path(fname).is_file():
+                print("ERROR: File '"+fname+"' not found, exiting.")
+                sys.exit(-1)
+            stream_file = fname
+            continue
+        if opt == "--json" or opt == "--quiet":
+            # One JSON record per attempt instead of the detailed output
+            json_mode = True
+            continue
         if opt.startswith("-l"):
             n=opt[2:]
             if n.isdecimal() and int(n) >= 1:
                 wlen=int(n)
-                anything="."*wlen
             else:
                 print("Invalid parameter for -l: '{0}'".format(n))
             print("Using {0} as word-length".format(wlen))
@@ -105,13 +231,116 @@ def process_options(argv):
             vpath = Path(fname)
             if vpath.is_file():
                 wordlist_file = fname
+                language = ""
                 print("Using '"+wordlist_file+"' as word list")
             else:
                 print("ERROR: Word list file '"+fname+"' not found, exiting")
                 sys.exit(-2)
             continue
+        if opt == "-m":
+            # Use the precomputed feedback matrix (requires numpy)
+            if not wordle_engine.have_numpy():
+                print("Warning: numpy is not installed, ignoring option -m")
+            else:
+                print("Using the precomputed feedback matrix for filtering")
+                use_fbmatrix = True
+            continue
+        if opt.startswith("-g") or opt.startswith("-G"):
+            # Suggest the best K next guesses
+            n=opt[2:]
+            if n == "":
+                n = "10"
+            if n.isdecimal():
+                suggest_n=int(n)
+            else:
+                print("Invalid parameter for {0}: '{1}'".format(opt[0:2], n))
+            suggest_metric = "entropy" if opt[1] == "g" else "size"
+            print("Suggesting up to {0} next guesses by expected {1}".format(suggest_n,
+                "information" if suggest_metric == "entropy" else "words remaining"))
+            continue
+        if opt == "--serve" or opt.startswith("--serve="):
+            # Run as a long-lived server for many concurrent games
+            serve_address = opt[8:] or "8585"
+            continue
+        if opt == "--simulate" or opt.startswith("--simulate="):
+            # Play a game against every word in the word list
+            simulate_strategy = opt[11:] or "first"
+            if simulate_strategy not in ("first", "entropy", "size"):
+                print("ERROR: Unknown strategy '"+simulate_strategy+"', valid ones are: first, entropy, size")
+                sys.exit(-7)
+            continue
+        if opt == "--verify":
+            # Check the filtering against the true feedback of every pair
+            verify_mode = True
+            continue
+        if opt.startswith("-j"):
+            # Number of worker processes for the parallel modes
+            n=opt[2:]
+            if n.isdecimal() and int(n) >= 1:
+                nworkers=int(n)
+                print("Using {0} worker processes".format(nworkers))
+            else:
+                print("Invalid parameter for -j: '{0}'".format(n))
+            continue
+        if opt.startswith("--boards="):
+            # Several simultaneous boards (e.g. 4 for Quordle, 8 for Octordle)
+            n=opt[9:]
+            if n.isdecimal() and int(n) >= 1:
+                nboards=int(n)
+                print("Playing {0} boards at once".format(nboards))
+            else:
+                print("Invalid parameter for --boards: '{0}'".format(n))
+            continue
+        if opt == "--cache" or opt.startswith("--cache="):
+            # Memoize the states reached by each sequence of attempts
+            n=opt[8:] or "64"
+            if n.isdecimal() and int(n) >= 1:
+                cache_mb=int(n)
+                print("Caching up to {0} MB of filtered states".format(cache_mb))
+            else:
+                print("Invalid parameter for --cache: '{0}'".format(n))
+            continue
+        if opt == "--cache-disk":
+            # Keep the cached opening states in .wordle-cache/ too
+            cache_disk = True
+            cache_mb = cache_mb or 64
+            continue
+        if opt == "--query" or opt.startswith("--query="):
+            # Answer wildcard/letter count queries instead of playing
+            query_mode = True
+            query_text = opt[8:]
+            continue
+        if opt == "--profile" or opt.startswith("--profile="):
+            # Time (and count words and bytes printed for) each phase and rule
+            import wordle_profile
+            profiler = wordle_profile.Profiler()
+            profile_file = opt[10:]
+            continue
+        if opt.startswith("-t"):
+            # Follow a precomputed decision tree for the given opener
+            tree_opener = opt[2:].lower()
+            if tree_opener == "":
+                print("ERROR: Option -t needs an opening guess, e.g. -tcrane")
+                sys.exit(-8)
+            continue
+        if opt.startswith("-e"):
+            name = opt[2:]
+            if name in wordle_engine.ENGINES:
+                engine_name = name
+                engine_given = True
+                print("Using the '"+engine_name+"' filtering engine")
+            else:
+                print("ERROR: Unknown engine '"+name+"', valid engines are: "+", ".join(wordle_engine.ENGINES))
+                sys.exit(-6)
+            continue
         print("ERROR: {0} is not an option, use -h for usage details".format(opt))
         sys.exit(-3)
+    if use_fbmatrix:
+        # The matrix filters the numpy engine's states, whatever the order of -m and -e
+        if engine_given and engine_name != "numpy":
+            print("ERROR: Option -m only works with the 'numpy' engine, not with -e"+engine_name)
+            sys.exit(-6)
+        engine_name = "numpy"
 
 def load_wordlist():
     global wordlist_file
@@ -121,35 +350,78 @@ def load_wordlist():
     global batch_mode
     global wc_msg
     global wlen
+    global engine
+    global index
+    global session
+    global fbmatrix
+    global boards
+    global prefix_cache
     word_set.clear()
     print("Loading word list...")
     if wordlist_file == "":
         # Use the default english word list
         wordlist_file="words_len5_en.txt"
-    """
-    Read word list ignoring comments, keeping only wlen letter words,
-    and making all words lowercase, creating a set from the result,
-    also updating abc if letters other than those in english appear
-    """
-    with open(wordlist_file) as wordlist_lines:
-        for line in wordlist_lines:
-            li = line.strip()
-            if not li.startswith("#"):
-                words = li.split()
-                for word in words:
-                    if len(word) == wlen:
-                        word = word.lower()
-                        word_set.add( word )
-                        # Make sure abc has all letters
-                        for letter in [*word]:
-                            if not letter in abc:
-                                abc.add(letter)
-                                abc_str = abc_str + letter
+    list_hash = None
+    if engine_name == "packed":
+        # Never holding the whole list as a set of strings
+        word_set, abc_str = wordle_engine.read_wordlist_packed(wordlist_file, wlen, abc_str)
+    else:
+        word_set, abc_str, list_hash = wordle_engine.read_wordlist_cached(wordlist_file,
+            wlen, abc_str)
+    abc = set(abc_str)
+    index = wordle_engine.WordIndex(word_set, abc_str, engine_name, wlen, list_hash)
+    engine = index.engine
+    prefix_cache = make_prefix_cache()
+    index.cache = prefix_cache
+    session = wordle_engine.WordleSession(index)
+    if nboards > 1:
+        boards = wordle_engine.MultiBoardSession(index, nboards)
     nwords = len(word_set)
     print("Size of starting word list: "+str(nwords))
     print("ABC has a total of {0} letters: {1}".format(len(abc), abc_str))
+    if use_fbmatrix and nwords > 0:
+        fbmatrix = wordle_engine.FeedbackMatrix(word_set, list_hash=index.list_hash)
+        if not fbmatrix.exists():
+            print("Building feedback matrix cache '"+fbmatrix.path+"'...")
+            fbmatrix.build(abc_str, nworkers)
+        fbmatrix.load()
+    if tree_opener != "":
+        load_decision_tree()
+
+def make_prefix_cache():
+    if cache_mb == 0:
+        return None
+    disk_dir = os.path.join(wordle_engine.CACHE_DIR, "states") if cache_disk else None
+    return wordle_engine.PrefixCache(cache_mb << 20, disk_dir)
+
+def load_decision_tree():
+    global dtree
+    if tree_opener not in word_set:
+        print("ERROR: Opener '"+tree_opener+"' is not in the word list, exiting.")
+        sys.exit(-8)
+    dtree = wordle_engine.GreedyDecisionTree(word_set, tree_opener,
+        list_hash=index.list_hash)
+    if dtree.exists():
+        dtree.load()
+    else:
+        print("Building decision tree '"+dtree.path+"'...")
+        dtree.build(abc_str, nworkers)
+        dtree.save()
+    print("Decision tree for '{0}': depth {1}, average of {2:.4f} guesses per word, "
+        "{3} words needing more than {4}".format(tree_opener, dtree.depth, dtree.avg_cost,
+        dtree.nfailed, wordle_engine.MAX_GUESSES))
+    session.follow(dtree)
+
+def show_tree_guess():
+    if dtree is None:
+        return
+    guess = session.next_guess()
+    if guess is None:
+        print("(The guesses and clues so far are not on the decision tree.)")
+    else:
+        print("Decision tree next guess: "+guess)
 
-def get_word(msg, valid_letters):
+def get_word(msg, valid_letters, allow_undo=False):
     global batch_mode
     global binputs
     global binput_index
@@ -168,6 +440,8 @@ def get_word(msg, valid_letters):
         if (word == ""):
             break
         word = word.strip()
+        if allow_undo and word == UNDO:
+            break
         if (len(word) != wlen):
             print("ERROR: Input '"+word+"' is not {0} characters long.".format(wlen))
             if batch_mode:
@@ -185,118 +459,155 @@ def get_word(msg, valid_letters):
                 break
     return word
 
-def do_filter_down(matching, pattern, msg):
-    global word_set
-    global msg_wr
-    print(msg)
-    if matching:
-        word_set = set(w for w in word_set if re.match(pattern, w))
+def rank_next_guesses(first):
+    if first:
+        ranking = wordle_engine.first_guess_ranking(word_set, abc_str,
+            suggest_metric, nworkers, fbmatrix, list_hash=index.list_hash)
+        if boards is not None:
+            # All boards start alike, so the joint scores just add up
+            ranking = [(guess, nboards * score) for guess, score in ranking]
+        return ranking
+    if boards is not None:
+        return wordle_engine.rank_guesses_joint(word_set,
+            [board.remaining() for board in boards.unsolved()],
+            abc_str, suggest_metric, nworkers, fbmatrix)
+    return wordle_engine.rank_guesses(word_set, session.remaining(),
+        abc_str, suggest_metric, nworkers, fbmatrix)
+
+def show_suggestions(first, ranking=None):
+    if suggest_n <= 0:
+        return
+    if ranking is None:
+        ranking = rank_next_guesses(first)
+    if suggest_metric == "entropy":
+        print("Suggested next guesses (expected information in bits):")
     else:
-        word_set = set(w for w in word_set if not re.match(pattern, w))
-    nwords = len(word_set)
-    print("\tWords remaining: "+str(nwords))
+        print("Suggested next guesses (expected number of words remaining):")
+    for guess, score in ranking[0:suggest_n]:
+        print("\t{0}  {1:.3f}".format(guess, score))
+
+def flush_records():
+    global json_records
+    if json_records:
+        records_out.write("".join(json_records))
+        records_out.flush()
+        json_records = []
+
+def report_profile():
+    # (Records still buffered are flushed first, for their bytes to count)
+    flush_records()
+    if profile_file != "":
+        profiler.save(profile_file)
+        print("Profile saved in '"+profile_file+"'", file=sys.stderr)
+    else:
+        profiler.report(sys.stderr)
+
+def process_attempt_json(n, guess, clues, cons, filtered=None):
+    """Filter, and add a JSON record for the attempt to the output buffer."""
+    candidates = session.candidates
+    record = {"attempt": n, "guess": guess, "clues": clues,
+              "known": engine.contains(candidates, guess),
+              "before": engine.count(candidates)}
+    record["constraint"] = cons.describe()
+    if fbmatrix is not None and fbmatrix.has(guess):
+        candidates = fbmatrix.filter(candidates, guess, clues)
+    elif profiler is not None:
+        mark = profiler.start()
+        candidates, remaining = profiler.filter_steps(engine, candidates, cons)
+        profiler.stop("filter", mark, record["before"], engine.count(candidates))
+        record["steps"] = cons.describe_steps(remaining)
+    else:
+        candidates, remaining = filtered or engine.filter_steps(candidates, cons)
+        record["steps"] = cons.describe_steps(remaining)
+    session.push(candidates, guess, clues)
+    nwords = engine.count(candidates)
+    record["remaining"] = nwords
+    if nwords <= show_max_n:
+        record["words"] = engine.words(candidates, ordered=False)
+    if dtree is not None:
+        record["next"] = session.next_guess()
+    json_records.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    if not batch_mode:
+        flush_records()
+    return nwords
 
-def process_attempt(n, guess, clues):
+def process_attempt(n, guess, clues, speculation=None):
     global BAR
-    global word_set
-    global ltrs_ynorep_all
-    global ltrs_gnorep_all
+    global engine
+    global session
     global show_max_n
     global batch_mode
+    global abc
 
-    msg_wr="\tWords remaining"
-    patterns_to_discard = []
-    patterns_to_keep = []
-    pattern_to_match = anything
-    lw = [*guess] # list of letters in guessed word
-    lc = [*clues] # list of letters in clues
-
-    goodset = set()     # Set of letters that are in the target word (clues g or y)
-    toomany = set()     # Used to identify excessive repetitions of a guessed letter
-    # Create dictionary for counters of letters in the guess
-    lcounters = dict()  # counters for each letter in the guess
-    for ltr in guess:
-        lcounters[ltr] = 0
-
-    # New processing/filtering logic as implemented in test_logic.py,
-    # with 3 passes:
-
-    # Pass 1: process g clues (perfect matches)
-    for i in range(wlen):
-        if (lc[i] != 'g'):
-            continue
-        ltr = lw[i]
-        si = str(i)
-        print("G" + ltr + si + "  :  Keep only words that contain '" + ltr + "' in slot " + si)
-        pattern_to_match = pattern_to_match[0:i] + ltr + pattern_to_match[i+1:]
-        goodset.add(ltr)
-        lcounters[ltr] += 1
-
-    # Pass 2: Process y clues
-    for i in range(wlen):
-        if (clues[i] != 'y'):
-            continue
-        ltr = guess[i]
-        si = str(i)
-        lcounters[ltr] += 1
-        if (ltr in goodset):
-            lc = lcounters[ltr]
-            slc = str(lc)
-            print("YR" + ltr + si + slc + ":  Discard words with '" + ltr + "' in slot " + si + ", and Keep only words that contain at least " + slc + " '" + ltr + "'s (Reps detected from y clue!)")
-        else:
-            lc = 1
-            print("Y" + ltr + si +"  :  Discard words with '"+ltr+"' in slot "+si+", and Keep only words that have '" + ltr + "' somewhere else.")
-        patterns_to_discard.append( anything[0:i] + ltr + anything[i+1:] )
-        patterns_to_keep.append( ((".*" + ltr)*lc) + ".*" )
-        goodset.add(ltr)
-
-    # Pass 3: Process '-' clues
-    for i in range(wlen):
-        if (clues[i] != "-"):
-            continue
-        ltr = guess[i]
-        lcounters[ltr] += 1
-        if (ltr in goodset):
-            # this letter had a g or y clue somewhere else
-            if ltr not in toomany:
-                # First time we see it with the - clue from this guess
-                si = str(i)
-                lc = lcounters[ltr]
-                slc = str(lc)
-                print("-R" + ltr + slc + " :  Discard words with '" + ltr +"' in slot " + si +", and also excessive Reps of '" + ltr + "' (" + slc + "x is one too many)")
-                patterns_to_discard.append( anything[0:i] + ltr + anything[i+1:] )
-                patterns_to_discard.append( ((".*" + ltr)*lc) + ".*" )
-                toomany.add(ltr)
-        else:
-            # ltr is not at all in the solution
-            if (lcounters[ltr] == 1):
-                # First time we see this letter in the guess, so do filter it out
-                print("-" + ltr + "*  :  Discard any words that contain '" + ltr + "' anywhere.")
-                patterns_to_discard.append( ".*" + ltr + ".*")
+    if profiler is not None:
+        mark = profiler.start()
+        profiler.mark()
+    # Compile guess and clues into a single constraint, using the
+    # 3-pass processing logic as implemented in test_logic.py
+    cons = wordle_engine.compile_clues(guess, clues, abc)
+    filtered, ranking = None, None
+    if speculation is not None:
+        filtered, ranking = speculation.take(guess, session.candidates, clues)
+    if json_mode:
+        nwords = process_attempt_json(n, guess, clues, cons, filtered)
+        if nwords == 1 or nwords == 0:
+            sys.exit(0)
+        return
+    for rule in cons.rules:
+        print(rule)
+        if profiler is not None:
+            profiler.printed_for(rule)
+    candidates = session.candidates
 
     # Details of current guess and corresponding clues
     print("\n\tAttempt: "+str(n))
     print(  "\tGuess  : "+guess)
     print(  "\tClues  : "+clues)
-    if (guess not in word_set):
+    if not engine.contains(candidates, guess):
         print("Warning: word '"+guess+"' was not found among remaining words.")
         print("(It might contain letter/position guesses already discarded.)")
-    nwords = len(word_set)
+    nwords = engine.count(candidates)
     print("\tWords remaining: "+str(nwords))
+    if profiler is not None:
+        profiler.stop("rules", mark)
+        mark = profiler.start()
 
-    # Filter further down list of remaining words given the new guess and clues
-    if pattern_to_match != anything:
-        do_filter_down(KEEP, pattern_to_match, "\tKeeping only words matching: "+pattern_to_match)
-
-    for pattern in patterns_to_discard:
-        do_filter_down(DISCARD, pattern,       "\tDiscarding words matching:   '"+pattern+"'")
-
-    for pattern in patterns_to_keep:
-        do_filter_down(KEEP   , pattern,       "\tKeeping words matching:      '"+pattern+"'")
+    if fbmatrix is not None and fbmatrix.has(guess):
+        # Single lookup of the precomputed feedback for this guess
+        candidates = fbmatrix.filter(candidates, guess, clues)
+        if profiler is not None:
+            profiler.stop("filter", mark, nwords, engine.count(candidates))
+            mark = profiler.start()
+        print("\tKeeping only words for which '"+guess+"' gets clues '"+clues+"'")
+        print("\tWords remaining: "+str(engine.count(candidates)))
+    else:
+        # Filter further down list of remaining words given the new guess and
+        # clues, checking each word only once against the compiled constraint
+        if profiler is not None:
+            # (One step at a time, timing the rule each one comes from)
+            candidates, remaining = profiler.filter_steps(engine, candidates, cons)
+            profiler.stop("filter", mark, nwords, engine.count(candidates))
+            mark = profiler.start()
+            profiler.mark()
+        else:
+            candidates, remaining = filtered or engine.filter_steps(candidates, cons)
+        for step, r, nleft in zip(cons.steps, cons.step_rules, remaining):
+            print(step[3])
+            print("\tWords remaining: "+str(nleft))
+            if profiler is not None:
+                profiler.printed_for(cons.rules[r])
+    session.push(candidates, guess, clues)
 
-    nwords = len(word_set)
-    if nwords <= show_max_n:
-        print("Actual words remaining: "+" ".join(sorted(word_set)))
+    nwords = engine.count(candidates)
+    show_remaining(nwords)
+    if profiler is not None:
+        profiler.stop("output", mark)
+        mark = profiler.start()
+    if nwords > 1:
+        show_suggestions(False, ranking)
+        show_tree_guess()
+        if profiler is not None:
+            profiler.stop("suggest", mark)
     if nwords == 1:
         print(BAR+"\nCongratulations, a single word was reached!!! :)")
         print("See you next time.\n"+BAR)
@@ -309,30 +620,314 @@ def process_attempt(n, guess, clues):
         sys.exit(0)
 
 
+def show_remaining(nwords):
+    """
+    Show the words remaining, if no more than show_max_n. With -r they
+    are ranked by letter frequency, and the top ones are shown anyway.
+    """
+    global letter_stats
+    if not rank_words:
+        if nwords <= show_max_n:
+            print("Actual words remaining: "+" ".join(session.remaining()))
+        return
+    if letter_stats is None:
+        # (First counted over the words left after the first attempt,
+        # usually much fewer than in the whole list)
+        letter_stats = wordle_engine.LetterStats(engine, session.candidates)
+    else:
+        letter_stats.update(session.candidates)
+    if nwords <= show_max_n:
+        print("Actual words remaining: "+" ".join(letter_stats.ranked()))
+    elif show_max_n > 0:
+        print("Top {0} words remaining by letter frequency: {1}".format(show_max_n,
+            " ".join(letter_stats.ranked(show_max_n))))
+
+def process_multi_attempt(guess, clues_list):
+    """Process a guess with the clues for every board."""
+    try:
+        counts = boards.apply(guess, clues_list)
+    except ValueError as e:
+        print("ERROR: "+str(e))
+        if batch_mode:
+            sys.exit(-5)
+        return
+    n = boards.depth
+    if json_mode:
+        record = {"attempt": n, "guess": guess, "clues": clues_list, "boards": []}
+        for b, board in enumerate(boards.boards):
+            result = {"solved": boards.solved[b], "remaining": counts[b]}
+            if counts[b] <= show_max_n:
+                result["words"] = board.remaining(ordered=False)
+            record["boards"].append(result)
+        json_records.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if not batch_mode:
+            flush_records()
+    else:
+        print("\n\tAttempt: "+str(n))
+        print(  "\tGuess  : "+guess)
+        for b, board in enumerate(boards.boards):
+            if boards.solved[b] and boards.solved[b] < n:
+                print("\tBoard {0}: solved in attempt {1}".format(b + 1, boards.solved[b]))
+                continue
+            print("\tBoard {0}: clues {1}, words remaining: {2}".format(b + 1,
+                clues_list[b], counts[b]))
+            if 0 < counts[b] <= show_max_n:
+                print("\t\t"+" ".join(board.remaining()))
+    if boards.is_solved():
+        print(BAR+"\nCongratulations, all {0} boards were solved!!! :)".format(nboards))
+        print("See you next time.\n"+BAR)
+        sys.exit(0)
+    if 0 in counts:
+        print("We ran out of words on some board, double-check your provided input.")
+    show_suggestions(False)
+
+def undo_multi_attempt():
+    guess = boards.undo()
+    if guess is None:
+        print("There are no attempts to undo.")
+        return
+    print("\n\tUndoing attempt: "+str(boards.depth + 1))
+    print(  "\tGuess  : "+guess)
+    for b, count in enumerate(boards.counts()):
+        print("\tBoard {0}: words remaining: {1}".format(b + 1, count))
+
+def get_multi_clues(msg):
+    """Clue strings for every board, all given in one line when interactive."""
+    if batch_mode:
+        clues_list = []
+        for b in range(nboards):
+            clues = get_word(msg, valid_clues)
+            if clues == "":
+                return []
+            clues_list.append(clues)
+        return clues_list
+    while True:
+        print(msg)
+        clues_list = input().split()
+        if len(clues_list) == 0:
+            return []
+        if len(clues_list) == nboards:
+            return [clues.lower() for clues in clues_list]
+        print("ERROR: {0} clue strings are needed, one per board.".format(nboards))
+
+def read_games(lines):
+    """
+    Generator of (id, attempts) for each game in lines, either JSON
+    objects like {"id": 7, "attempts": [["aside", "-ygy-"], ...]},
+    or plain lines with guesses and clues, e.g. "aside -ygy- slick y-g-g".
+    Blank lines and lines starting with '#' are ignored.
+    """
+    for nline, line in enumerate(lines, 1):
+        line = line.strip()
+        if len(line) == 0 or line.startswith("#"):
+            continue
+        if line.startswith("{"):
+            try:
+                record = json.loads(line)
+                yield record.get("id", nline), record.get("attempts")
+            except (ValueError, AttributeError):
+                yield nline, None
+        else:
+            words = line.split()
+            yield nline, list(zip(words[0::2], words[1::2])) if len(words) % 2 == 0 else None
+
+def play_games(games):
+    """Generator of one compact result record for each game."""
+    for gid, attempts in games:
+        if profiler is not None:
+            mark = profiler.start()
+        if not isinstance(attempts, list):
+            yield {"id": gid, "error": "invalid game record"}
+            continue
+        state = index.start
+        prefix = ()
+        error = None
+        for n, attempt in enumerate(attempts, 1):
+            try:
+                guess, clues = [str(x).strip().lower() for x in attempt]
+            except (TypeError, ValueError):
+                error = "invalid attempt {0}".format(n)
+                break
+            if len(guess) != wlen or len(clues) != wlen:
+                error = "attempt {0} is not {1} characters long".format(n, wlen)
+                break
+            if not set(guess) <= abc or not set(clues) <= valid_clues:
+                error = "invalid character in attempt {0}".format(n)
+                break
+            prefix += ((guess, clues),)
+            cached = prefix_cache.get(index, prefix) if prefix_cache is not None else None
+            if cached is not None:
+                state = cached
+            else:
+                cons = wordle_engine.compile_clues(guess, clues, abc)
+                if profiler is not None:
+                    state, remaining = profiler.filter_steps(engine, state, cons)
+                else:
+                    state = engine.filter(state, cons)
+                if prefix_cache is not None:
+                    prefix_cache.put(index, prefix, state)
+        if error is not None:
+            yield {"id": gid, "error": error}
+            continue
+        nwords = engine.count(state)
+        result = {"id": gid, "attempts": len(attempts), "remaining": nwords}
+        if nwords <= show_max_n:
+            result["words"] = engine.words(state)
+        if profiler is not None:
+            profiler.stop("game", mark, len(word_set), nwords)
+        yield result
+
+def do_stream_batch():
+    if stream_file == "-":
+        lines = sys.stdin
+    else:
+        lines = open(stream_file)
+    with lines:
+        for result in play_games(read_games(lines)):
+            if profiler is not None:
+                mark = profiler.start()
+            records_out.write(json.dumps(result, ensure_ascii=False, separators=(",", ":")) + "\n")
+            if profiler is not None:
+                profiler.stop("output", mark)
+    records_out.flush()
+    if prefix_cache is not None:
+        print("Prefix cache: " + ", ".join("{0} {1}".format(k, v)
+            for k, v in prefix_cache.stats().items()))
+
+def answer_query(text):
+    """Show the words matching a query, returning False if it is not valid."""
+    try:
+        nwords, words = index.query(text, show_max_n)
+    except ValueError as e:
+        print("ERROR: Invalid query '"+text+"': "+str(e))
+        return False
+    print("\tQuery  : "+text)
+    print("\tWords matching: "+str(nwords))
+    if 0 < nwords <= show_max_n:
+        print("Actual words matching: "+" ".join(words))
+    return True
+
+def do_query_loop():
+    msg_enter_query="\n===== Please enter your query (e.g. s?a?e -r e>=2), or Enter to leave:"
+    if query_text != "":
+        sys.exit(0 if answer_query(query_text) else -9)
+    while True:
+        print(msg_enter_query)
+        try:
+            text = input().strip()
+        except EOFError:
+            text = ""
+        if text == "":
+            print("No more queries, see you next time.")
+            break
+        answer_query(text)
+    sys.exit(0)
+
+def undo_attempt():
+    undone = session.undo()
+    if undone is None:
+        print("There are no attempts to undo.")
+        return
+    nwords = session.count()
+    if json_mode:
+        record = {"undo": session.depth + 1, "guess": undone[0], "clues": undone[1],
+                  "remaining": nwords}
+        json_records.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+        if not batch_mode:
+            flush_records()
+        return
+    print("\n\tUndoing attempt: "+str(session.depth + 1))
+    print(  "\tGuess  : "+undone[0])
+    print(  "\tClues  : "+undone[1])
+    print(  "\tWords remaining: "+str(nwords))
+    show_remaining(nwords)
+    show_tree_guess()
+
 def do_helper_loop():
     global abc
     global valid_clues
     msg_eoi="No more inputs, see you next time."
-    msg_enter_guess="\n===== Please enter your {0}-letter wordle guess, or Enter to leave:".format(wlen)
+    msg_enter_guess="\n===== Please enter your {0}-letter wordle guess, '{1}' to undo the last attempt, or Enter to leave:".format(wlen, UNDO)
     msg_enter_clues="===== Please enter the resulting clues (e.g. -yg--), or Enter to leave:"
-    attempt = 0
+    msg_enter_multi_clues="===== Please enter the clues for each of the {0} boards, separated by spaces (anything for boards already solved), or Enter to leave:".format(nboards)
+    if profiler is not None:
+        mark = profiler.start()
+    show_suggestions(True)
+    show_tree_guess()
+    if profiler is not None:
+        profiler.stop("suggest", mark)
     while True:
-        word = get_word(msg_enter_guess, abc)
+        word = get_word(msg_enter_guess, abc, allow_undo=True)
         if (word == ""):
             print(msg_eoi)
             break
+        if (word == UNDO):
+            if boards is not None:
+                undo_multi_attempt()
+            else:
+                undo_attempt()
+            continue
+        if boards is not None:
+            clues_list = get_multi_clues(msg_enter_multi_clues)
+            if clues_list == []:
+                print(msg_eoi)
+                break
+            process_multi_attempt(word, clues_list)
+            continue
+        # Get a head start on the filtering while the clues are typed in
+        speculation = None
+        if not batch_mode and fbmatrix is None and profiler is None:
+            speculation = Speculation(word, session.candidates)
         clues = get_word(msg_enter_clues, valid_clues)
         if (clues == ""):
             print(msg_eoi)
             break
-        attempt = attempt + 1
-        process_attempt(attempt, word, clues)
+        process_attempt(session.depth + 1, word, clues, speculation)
     sys.exit(0)
 
 def do_wordle_helper(argv):
+    global records_out
+    # Records always go to the real stdout, whatever it gets redirected to below
+    real_stdout = sys.stdout
+    records_out = real_stdout
+    if any(opt.startswith("-B") or opt == "--json" for opt in argv):
+        # In streaming batch and json modes only result records go to
+        # stdout, everything else is shown on stderr (or nowhere if quiet)
+        sys.stdout = sys.stderr
+    if "--quiet" in argv:
+        sys.stdout = open(os.devnull, "w")
+    atexit.register(flush_records)
     starting_banner()
     process_options(argv)
+    if profiler is not None:
+        sys.stdout = profiler.wrap(sys.stdout)
+        records_out = profiler.wrap(records_out)
+        atexit.register(report_profile)
+    if serve_address != "":
+        # (imported only here, asyncio adds noticeably to start-up time)
+        import wordle_server
+        wordle_server.serve(serve_address, engine_name, show_max_n,
+            language or wordlist_file, wlen, tree_opener, make_prefix_cache())
+        sys.exit(0)
+    if profiler is not None:
+        mark = profiler.start()
     load_wordlist()
+    if profiler is not None:
+        profiler.stop("load", mark, 0, len(word_set))
+    if simulate_strategy != "":
+        import wordle_simulate
+        wordle_simulate.simulate(word_set, abc_str, engine_name,
+            simulate_strategy, nworkers, fbmatrix)
+        sys.exit(0)
+    if verify_mode:
+        import wordle_verify
+        mismatches = wordle_verify.verify(word_set, abc_str, engine_name, nworkers)
+        sys.exit(1 if mismatches > 0 else 0)
+    if query_mode:
+        do_query_loop()
+    if stream_file != "":
+        do_stream_batch()
+        sys.exit(0)
     do_helper_loop()
 
 
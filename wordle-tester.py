@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# SPDX-License-Identifier: MIT
+
+"""
+wordle-tester.py
+Created    : 2026.10.18
+
+Regression runner for wordle-helper.py, the python twin of
+wordle-tester.sh, for running the tests quickly and often.
+
+Every input_test_*.txt file is a test case, with its expectations given
+in comment lines of the file itself:
+
+    # test-options: -s -n500
+    # test-expect: junio
+    # test-reject: litio obvio
+
+The helper is run in batch mode with those options and the file as
+input, and the last list of words it shows ("Actual words remaining")
+must include all the expected words and none of the rejected ones.
+Cases run in-process (each with a fresh copy of the helper's module,
+its output captured) across a pool of worker processes, and each one
+is timed. Times are compared with those saved by a previous run with
+--save-timings, flagging the cases that got noticeably slower.
+
+Usage:
+  ./wordle-tester.py [-jN] [--parity] [--save-timings] [--slow=F]
+
+    -jN            : use N worker processes (default is the number of cores)
+    --parity       : also run the bash twin, wordle-helper.sh, for every
+                     case (concurrently, as separate processes), checking
+                     that its output matches that of the python script.
+                     Times are not compared in this case
+    --save-timings : save the time of each case as the reference for
+                     later runs (in .wordle-cache/tester_timings.json)
+    --slow=F       : flag cases taking more than F times their reference
+                     time (default 1.5)
+
+Exits with 1 if any case fails its expectations.
+
+"""
+
+import contextlib
+import glob
+import importlib.util
+import io
+import json
+import os
+import subprocess
+import sys
+import time
+
+HELPER_PY       = "wordle-helper.py"
+HELPER_SH       = "./wordle-helper.sh"
+TIMINGS_FILE    = os.path.join(".wordle-cache", "tester_timings.json")
+SLOW_FACTOR     = 1.5
+SLOW_MIN_MS     = 5.0       # Differences below this are just noise
+
+
+def read_case(fname):
+    """Options, expected, and rejected words given in the comments of fname."""
+    fields = {"options": [], "expect": [], "reject": []}
+    with open(fname) as lines:
+        for line in lines:
+            line = line.strip()
+            if not line.startswith("# test-"):
+                continue
+            key, _, value = line[len("# test-"):].partition(":")
+            if key in fields:
+                fields[key].extend(value.split())
+    return fields["options"], fields["expect"], fields["reject"]
+
+
+def helper_args(fname, options):
+    return options + ["-b" + fname]
+
+
+def run_case(fname):
+    """
+    Run the python helper for one case in-process, returning
+    (fname, output, milliseconds.)
+    """
+    options, expect, reject = read_case(fname)
+    spec = importlib.util.spec_from_file_location("wordle_helper_case", HELPER_PY)
+    helper = importlib.util.module_from_spec(spec)
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        spec.loader.exec_module(helper)
+        try:
+            helper.do_wordle_helper(helper_args(fname, options))
+        except SystemExit:
+            pass
+    elapsed = 1000 * (time.perf_counter() - start)
+    return fname, output.getvalue(), elapsed
+
+
+def check_output(output, expect, reject):
+    """Error message if output does not meet the expectations, or None."""
+    shown = [line for line in output.splitlines() if line.startswith("Actual words")]
+    if not shown:
+        return "no words were shown"
+    words = set(shown[-1].split(":", 1)[1].split())
+    missing = [w for w in expect if w not in words]
+    present = [w for w in reject if w in words]
+    if missing:
+        return "missing " + " ".join(missing)
+    if present:
+        return "should not show " + " ".join(present)
+    return None
+
+
+def comparable(output):
+    """Output without the banner lines, as compared by wordle-tester.sh."""
+    return [line for line in output.splitlines() if "|" not in line]
+
+
+def start_bash_twin(fname):
+    options, expect, reject = read_case(fname)
+    return subprocess.Popen([HELPER_SH] + helper_args(fname, options),
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+
+
+def run_cases(cases, nworkers):
+    """Generator of (fname, output, milliseconds) as each case finishes."""
+    nworkers = min(nworkers or os.cpu_count() or 1, len(cases))
+    if nworkers <= 1:
+        for fname in cases:
+            yield run_case(fname)
+    else:
+        from multiprocessing import Pool
+        with Pool(nworkers) as pool:
+            for result in pool.imap_unordered(run_case, cases):
+                yield result
+
+
+def load_timings():
+    try:
+        with open(TIMINGS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return dict()
+
+
+def save_timings(timings):
+    os.makedirs(os.path.dirname(TIMINGS_FILE), exist_ok=True)
+    with open(TIMINGS_FILE, "w") as f:
+        json.dump(timings, f, indent=1, sort_keys=True)
+
+
+def main(argv):
+    nworkers = None
+    parity = False
+    saving = False
+    slow_factor = SLOW_FACTOR
+    for opt in argv:
+        if opt.startswith("-j") and opt[2:].isdecimal() and int(opt[2:]) >= 1:
+            nworkers = int(opt[2:])
+        elif opt == "--parity":
+            parity = True
+        elif opt == "--save-timings":
+            saving = True
+        elif opt.startswith("--slow="):
+            try:
+                slow_factor = float(opt[7:])
+            except ValueError:
+                slow_factor = 0.0
+            if not slow_factor > 0:
+                print("Invalid parameter for --slow: '{0}'".format(opt[7:]))
+                print(__doc__.split("Usage:")[1].rstrip())
+                return 2
+        else:
+            print(__doc__.split("Usage:")[1].rstrip())
+            return 2
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    cases = sorted(glob.glob("input_test_*.txt"))
+    print("Testing wordle-helper.py with {0} cases{1}:".format(len(cases),
+        " (and wordle-helper.sh for parity)" if parity else ""))
+    start = time.perf_counter()
+    # The bash twin is much slower, so it gets going first
+    twins = dict((fname, start_bash_twin(fname)) for fname in cases) if parity else dict()
+    # (Times taken alongside the bash twin are not comparable)
+    reference = load_timings() if not parity else dict()
+    timings = dict()
+    outputs = dict()
+    failed = 0
+    nslow = 0
+    for fname, output, elapsed in run_cases(cases, nworkers):
+        options, expect, reject = read_case(fname)
+        error = check_output(output, expect, reject)
+        timings[fname] = round(elapsed, 2)
+        outputs[fname] = output
+        status = "succeeded" if error is None else "FAILED (" + error + ")"
+        if error is not None:
+            failed += 1
+        note = ""
+        ref = reference.get(fname)
+        if ref is not None and elapsed > slow_factor * ref and elapsed - ref > SLOW_MIN_MS:
+            note = "  SLOWER than {0:.1f} ms before".format(ref)
+            nslow += 1
+        print("{0}: {1} in {2:.1f} ms{3}".format(fname, status, elapsed, note), flush=True)
+    elapsed = time.perf_counter() - start
+    if parity:
+        for fname in cases:
+            output_sh = twins[fname].communicate()[0]
+            if comparable(output_sh) != comparable(outputs[fname]):
+                print("Warning: output differences detected between .sh/.py scripts for " + fname)
+            else:
+                print(fname + ": .sh/.py outputs match")
+    print("{0} of {1} cases succeeded, in {2:.3f} s".format(len(cases) - failed, len(cases),
+        time.perf_counter() - start if parity else elapsed))
+    if nslow > 0:
+        print("{0} cases got slower than their reference times".format(nslow))
+    if saving and parity:
+        print("Not saving times taken with --parity as reference")
+    elif saving:
+        save_timings(timings)
+        print("Saved these times as reference in " + TIMINGS_FILE)
+    return 1 if failed > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
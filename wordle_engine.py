@@ -0,0 +1,2219 @@
+# SPDX-License-Identifier: MIT
+
+"""
+wordle_engine.py
+Created    : 2026.10.18
+
+Clue processing and filtering engine used by wordle-helper.py.
+
+A guess and its clues (g, y, or -) are compiled into a single
+Constraint object: the letters still allowed in each slot, plus the
+minimum and maximum number of times each letter can appear. Candidate
+words are then checked once per attempt against that constraint,
+without building or running any regular expressions.
+
+The compiled constraint also keeps the ordered list of individual
+filtering steps (the ones the original regex-based logic went
+through), so the helper can still report how many words remain
+after each of them.
+
+Interchangeable engines hold the candidate words and apply the
+compiled constraints: BitsetEngine (the default), working on python
+ints as bitsets over an inverted (slot, letter) and (letter, count)
+index, SetEngine, working on plain python sets, and NumpyEngine,
+working on an (N, wlen) uint8 matrix of letter codes with per-letter
+count columns, where each constraint becomes a vectorized boolean mask.
+NumpyEngine is only available when numpy is installed.
+
+FeedbackMatrix holds the precomputed Wordle feedback of every
+guess/answer pair in a word list, encoded as base-3 integers and kept
+in a cache file which is memory-mapped on later runs, so filtering by
+a guess and its clues becomes a single row lookup and comparison.
+
+rank_guesses scores possible next guesses against the remaining
+candidates, by expected information gain (entropy of the feedback
+distribution) or by expected number of remaining words, splitting the
+work across a process pool.
+
+WordleSession is the library interface for playing games: it keeps its
+own history of candidate states over a shared, immutable WordIndex,
+with cheap apply(), undo() and fork() operations.
+
+"""
+
+import hashlib
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+
+# numpy (and multiprocessing) are only imported when actually needed,
+# so that the plain set engine starts up as fast as possible
+numpy = None
+
+CACHE_DIR   = ".wordle-cache"
+CLUE_VALUES = {"-": 0, "y": 1, "g": 2}
+
+# Kinds of filtering steps, in the order the helper reports them
+FIXED   = "fixed"      # Keep only words with the given letters in the given slots
+NOT_AT  = "not_at"     # Discard words with a letter in a given slot
+AT_MOST = "at_most"    # Discard words with too many repetitions of a letter
+AT_LEAST= "at_least"   # Keep only words with at least n repetitions of a letter
+
+
+def have_numpy():
+    """Import numpy on first use, returning False if it is not installed."""
+    global numpy
+    if numpy is None:
+        try:
+            import numpy as np
+        except ImportError:
+            return False
+        numpy = np
+    return True
+
+
+def worker_count(nworkers=None):
+    """Number of worker processes for the parallel modes: nworkers, or one per core."""
+    return nworkers or os.cpu_count() or 1
+
+
+def parallel_map(func, items, nworkers, initializer, initargs=()):
+    """
+    Generator of func(item) for every one of items, as each finishes,
+    on nworkers processes (see worker_count) set up by calling
+    initializer(*initargs) in each. With a single worker, everything
+    is done in this process instead, without starting any other.
+    """
+    nworkers = worker_count(nworkers)
+    if nworkers == 1:
+        initializer(*initargs)
+        for item in items:
+            yield func(item)
+        return
+    from multiprocessing import Pool
+    with Pool(nworkers, initializer=initializer, initargs=initargs) as pool:
+        yield from pool.imap_unordered(func, items)
+
+
+def read_wordlist(fname, wlen, abc_str):
+    """
+    Read word list ignoring comments, keeping only wlen letter words,
+    and making all words lowercase, creating a set from the result,
+    also extending abc_str if letters other than those in english appear.
+    Returns the set of words and the (possibly extended) abc_str.
+    """
+    word_set = set()
+    abc = set(abc_str)
+    with open(fname) as wordlist_lines:
+        for line in wordlist_lines:
+            li = line.strip()
+            if not li.startswith("#"):
+                words = li.split()
+                for word in words:
+                    if len(word) == wlen:
+                        word = word.lower()
+                        word_set.add( word )
+                        # Make sure abc has all letters
+                        for letter in [*word]:
+                            if not letter in abc:
+                                abc.add(letter)
+                                abc_str = abc_str + letter
+    return word_set, abc_str
+
+
+def wordlist_hash(words):
+    """Short hash identifying a word list (independent of its order)."""
+    h = hashlib.sha1()
+    if isinstance(words, PackedWords):
+        h.update(words.lines_utf8())
+        return h.hexdigest()[:16]
+    for w in sorted(words):
+        h.update(w.encode("utf-8") + b"\n")
+    return h.hexdigest()[:16]
+
+
+def feedback(guess, answer):
+    """
+    Clues (g, y, or -) Wordle gives for guess when the solution is
+    answer: greens first, then yellows from left to right, only while
+    there are unmatched repetitions of that letter left in answer.
+    """
+    wlen = len(guess)
+    result = ["-"] * wlen
+    available = dict()
+    for i in range(wlen):
+        if guess[i] == answer[i]:
+            result[i] = "g"
+        else:
+            available[answer[i]] = available.get(answer[i], 0) + 1
+    for i in range(wlen):
+        if result[i] == "g":
+            continue
+        ltr = guess[i]
+        if available.get(ltr, 0) > 0:
+            result[i] = "y"
+            available[ltr] -= 1
+    return "".join(result)
+
+
+def clues_code(clues):
+    """Encode a clue string as a base-3 integer ('-'=0, 'y'=1, 'g'=2)."""
+    code = 0
+    for c in reversed(clues):
+        code = code * 3 + CLUE_VALUES[c]
+    return code
+
+
+# Binary word list cache: header, alphabet (utf-8), then the words
+# packed as one byte per letter (index of the letter in the alphabet.)
+# The header has the mtime, size, and sha1 of the word list file it was
+# built from, and the wordlist_hash of its words
+WLC_MAGIC   = b"WLC2"
+WLC_HEADER  = struct.Struct("<4sHqq20s16sII")
+
+
+def wordlist_cache_path(fname, wlen):
+    return "{0}.{1}.wlc".format(fname, wlen)
+
+
+def _file_sha1(fname):
+    with open(fname, "rb") as f:
+        return hashlib.sha1(f.read()).digest()
+
+
+def _read_wordlist_cache(path, wlen, abc_str, fname, src_stat):
+    """
+    Words, alphabet, and wordlist_hash from a binary cache file, plus
+    whether the word list's mtime and size are still those stored (if
+    not, the list was only touched), or None if it is missing, or no
+    longer matches the contents of the word list it was built from.
+    Only when the mtime or size differ is the list itself read.
+    """
+    try:
+        with open(path, "rb") as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    with mm:
+        if len(mm) < WLC_HEADER.size:
+            return None
+        magic, cwlen, mtime, size, sha1, list_hash, abc_len, nwords = \
+            WLC_HEADER.unpack_from(mm, 0)
+        if magic != WLC_MAGIC or cwlen != wlen:
+            return None
+        same_stat = mtime == src_stat.st_mtime_ns and size == src_stat.st_size
+        if not same_stat:
+            try:
+                if _file_sha1(fname) != sha1:
+                    return None
+            except OSError:
+                return None
+        start = WLC_HEADER.size
+        cabc_str = mm[start:start + abc_len].decode("utf-8")
+        if not cabc_str.startswith(abc_str):
+            return None
+        start += abc_len
+        packed = mm[start:start + nwords * wlen]
+    if len(packed) != nwords * wlen:
+        return None
+    if all(ord(c) < 256 for c in cabc_str):
+        table = bytes.maketrans(bytes(range(len(cabc_str))), cabc_str.encode("latin-1"))
+        text = packed.translate(table).decode("latin-1")
+        words = [text[i:i + wlen] for i in range(0, len(text), wlen)]
+    else:
+        words = ["".join(cabc_str[c] for c in packed[i:i + wlen])
+                 for i in range(0, len(packed), wlen)]
+    return set(words), cabc_str, list_hash.decode("ascii"), same_stat
+
+
+def _write_wordlist_cache(path, wlen, word_set, abc_str, src_stat, src_sha1, list_hash):
+    if len(abc_str) > 256:
+        return
+    codes = dict((ltr, i) for i, ltr in enumerate(abc_str))
+    wordlist = sorted(word_set)
+    packed = bytes(codes[ltr] for w in wordlist for ltr in w)
+    abc_bytes = abc_str.encode("utf-8")
+    header = WLC_HEADER.pack(WLC_MAGIC, wlen, src_stat.st_mtime_ns, src_stat.st_size,
+        src_sha1, list_hash.encode("ascii"), len(abc_bytes), len(wordlist))
+    tmp_path = path + ".tmp." + str(os.getpid())
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(header + abc_bytes + packed)
+        os.replace(tmp_path, path)
+    except OSError:
+        # Caching is only an optimization, e.g. the list might be read-only
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def read_wordlist_cached(fname, wlen, abc_str):
+    """
+    Same as read_wordlist, but using a binary cache file next to the
+    word list, also returning the wordlist_hash of the words (stored in
+    the cache file, so it is not computed again on every start.)
+
+    The cache is used as it is while the list's mtime and size are
+    those it was built from. Otherwise the list's contents are checked
+    against the cache, which is rebuilt if they changed (or just gets
+    the new mtime and size, if they did not.)
+    """
+    try:
+        src_stat = os.stat(fname)
+    except OSError:
+        word_set, abc_str = read_wordlist(fname, wlen, abc_str)
+        return word_set, abc_str, wordlist_hash(word_set)
+    path = wordlist_cache_path(fname, wlen)
+    cached = _read_wordlist_cache(path, wlen, abc_str, fname, src_stat)
+    if cached is not None:
+        word_set, abc_str, list_hash, same_stat = cached
+        if not same_stat:
+            _write_wordlist_cache(path, wlen, word_set, abc_str, src_stat,
+                _file_sha1(fname), list_hash)
+        return word_set, abc_str, list_hash
+    word_set, abc_str = read_wordlist(fname, wlen, abc_str)
+    list_hash = wordlist_hash(word_set)
+    try:
+        src_sha1 = _file_sha1(fname)
+    except OSError:
+        return word_set, abc_str, list_hash
+    _write_wordlist_cache(path, wlen, word_set, abc_str, src_stat, src_sha1, list_hash)
+    return word_set, abc_str, list_hash
+
+
+class Constraint:
+    """
+    Compiled form of the clues received for a guess.
+
+    slots      : list with the set of letters allowed in each slot
+    min_counts : dict letter -> minimum times it must appear
+    max_counts : dict letter -> maximum times it can appear
+    rules      : explanation lines for the G/Y/YR/-R/-* rules derived
+    steps      : ordered filtering steps as (kind, arg1, arg2, message)
+    step_rules : for each step, the index in rules of the rule it comes
+                 from (the first G rule, for the step of all G rules)
+    """
+    __slots__ = ("wlen", "abc", "slots", "min_counts", "max_counts", "rules", "steps",
+                 "step_rules", "_checks")
+
+    def __init__(self, wlen, abc):
+        self.wlen = wlen
+        self.abc = frozenset(abc)
+        self.slots = [self.abc] * wlen
+        self.min_counts = dict()
+        self.max_counts = dict()
+        self.rules = []
+        self.steps = []
+        self.step_rules = []
+        self._checks = None
+
+    def checks(self):
+        """
+        The conditions of this constraint arranged for fast checking:
+        letters not allowed anywhere, restricted slots, minimum counts,
+        and (non zero) maximum counts.
+        """
+        if self._checks is None:
+            absent = [ltr for ltr, n in self.max_counts.items() if n == 0]
+            slots = [(i, s) for i, s in enumerate(self.slots) if s != self.abc]
+            at_least = list(self.min_counts.items())
+            at_most = [(ltr, n) for ltr, n in self.max_counts.items() if n > 0]
+            self._checks = (absent, slots, at_least, at_most)
+        return self._checks
+
+    def matches(self, word):
+        """True if word satisfies all slot and letter count conditions."""
+        slots = self.slots
+        for i in range(self.wlen):
+            if word[i] not in slots[i]:
+                return False
+        for ltr, n in self.min_counts.items():
+            if word.count(ltr) < n:
+                return False
+        for ltr, n in self.max_counts.items():
+            if word.count(ltr) > n:
+                return False
+        return True
+
+    def first_failure(self, word):
+        """
+        Index of the first step that would filter out word,
+        or len(steps) if word survives all of them.
+        """
+        k = 0
+        for kind, a, b, _ in self.steps:
+            if kind == FIXED:
+                for i, ltr in a:
+                    if word[i] != ltr:
+                        return k
+            elif kind == NOT_AT:
+                if word[a] == b:
+                    return k
+            elif kind == AT_MOST:
+                if word.count(a) > b:
+                    return k
+            elif word.count(a) < b:
+                return k
+            k += 1
+        return k
+
+    def filter(self, words):
+        """Return the set of words satisfying this constraint."""
+        absent, slots, at_least, at_most = self.checks()
+        survivors = set()
+        add = survivors.add
+        # Same conditions as in matches(), inlined and cheapest first
+        for w in words:
+            for ltr in absent:
+                if ltr in w:
+                    break
+            else:
+                for i, allowed in slots:
+                    if w[i] not in allowed:
+                        break
+                else:
+                    for ltr, n in at_least:
+                        if w.count(ltr) < n:
+                            break
+                    else:
+                        for ltr, n in at_most:
+                            if w.count(ltr) > n:
+                                break
+                        else:
+                            add(w)
+        return survivors
+
+    def filter_steps(self, words):
+        """
+        Single pass over words returning the set of surviving words,
+        together with the number of words remaining after each step.
+        """
+        nsteps = len(self.steps)
+        failed = [0] * (nsteps + 1)
+        survivors = set()
+        for w in words:
+            k = self.first_failure(w)
+            failed[k] += 1
+            if k == nsteps:
+                survivors.add(w)
+        remaining = []
+        nwords = len(words)
+        for k in range(nsteps):
+            nwords -= failed[k]
+            remaining.append(nwords)
+        return survivors, remaining
+
+    def describe(self):
+        """JSON friendly summary of the constraint and the rules it came from."""
+        fixed = dict()
+        banned = dict()
+        for i, allowed in enumerate(self.slots):
+            if len(allowed) == 1:
+                fixed[str(i)] = next(iter(allowed))
+            elif allowed != self.abc:
+                banned[str(i)] = "".join(sorted(self.abc - allowed))
+        return {"rules": [rule.split(":")[0].strip() for rule in self.rules],
+                "fixed": fixed, "banned": banned,
+                "min": dict(self.min_counts), "max": dict(self.max_counts)}
+
+    def describe_steps(self, remaining):
+        """JSON friendly list of the filtering steps and words remaining after each."""
+        steps = []
+        for (kind, a, b, _), nwords in zip(self.steps, remaining):
+            if kind == FIXED:
+                step = {"kind": kind, "fixed": dict((str(i), ltr) for i, ltr in a)}
+            elif kind == NOT_AT:
+                step = {"kind": kind, "slot": a, "letter": b}
+            else:
+                step = {"kind": kind, "letter": a, "count": b}
+            step["remaining"] = nwords
+            steps.append(step)
+        return steps
+
+    def _ban(self, i, ltr):
+        self.slots[i] = self.slots[i] - {ltr}
+        self._checks = None
+
+    def _at_least(self, ltr, n):
+        self.min_counts[ltr] = max(n, self.min_counts.get(ltr, 0))
+        self._checks = None
+
+    def _at_most(self, ltr, n):
+        self.max_counts[ltr] = min(n, self.max_counts.get(ltr, n))
+        self._checks = None
+
+
+def compile_clues(guess, clues, abc):
+    """
+    Compile a guess and its clues into a Constraint, using the 3-pass
+    logic as implemented in test_logic.py.
+    """
+    wlen = len(guess)
+    anything = "." * wlen
+    cons = Constraint(wlen, abc)
+    rules = cons.rules
+    fixed = []
+    discards = []
+    keeps = []
+
+    goodset = set()     # Set of letters that are in the target word (clues g or y)
+    toomany = set()     # Used to identify excessive repetitions of a guessed letter
+    # Create dictionary for counters of letters in the guess
+    lcounters = dict()  # counters for each letter in the guess
+    for ltr in guess:
+        lcounters[ltr] = 0
+
+    # Pass 1: process g clues (perfect matches)
+    for i in range(wlen):
+        if (clues[i] != 'g'):
+            continue
+        ltr = guess[i]
+        si = str(i)
+        rules.append("G" + ltr + si + "  :  Keep only words that contain '" + ltr + "' in slot " + si)
+        fixed.append((i, ltr))
+        cons.slots[i] = frozenset(ltr)
+        cons._checks = None
+        goodset.add(ltr)
+        lcounters[ltr] += 1
+
+    # Pass 2: Process y clues
+    for i in range(wlen):
+        if (clues[i] != 'y'):
+            continue
+        ltr = guess[i]
+        si = str(i)
+        lcounters[ltr] += 1
+        if (ltr in goodset):
+            lc = lcounters[ltr]
+            slc = str(lc)
+            rules.append("YR" + ltr + si + slc + ":  Discard words with '" + ltr + "' in slot " + si + ", and Keep only words that contain at least " + slc + " '" + ltr + "'s (Reps detected from y clue!)")
+        else:
+            lc = 1
+            rules.append("Y" + ltr + si +"  :  Discard words with '"+ltr+"' in slot "+si+", and Keep only words that have '" + ltr + "' somewhere else.")
+        r = len(rules) - 1
+        discards.append((NOT_AT, i, ltr, anything[0:i] + ltr + anything[i+1:], r))
+        keeps.append((AT_LEAST, ltr, lc, ((".*" + ltr)*lc) + ".*", r))
+        cons._ban(i, ltr)
+        cons._at_least(ltr, lc)
+        goodset.add(ltr)
+
+    # Pass 3: Process '-' clues
+    for i in range(wlen):
+        if (clues[i] != "-"):
+            continue
+        ltr = guess[i]
+        lcounters[ltr] += 1
+        if (ltr in goodset):
+            # this letter had a g or y clue somewhere else
+            if ltr not in toomany:
+                # First time we see it with the - clue from this guess
+                si = str(i)
+                lc = lcounters[ltr]
+                slc = str(lc)
+                rules.append("-R" + ltr + slc + " :  Discard words with '" + ltr +"' in slot " + si +", and also excessive Reps of '" + ltr + "' (" + slc + "x is one too many)")
+                r = len(rules) - 1
+                discards.append((NOT_AT, i, ltr, anything[0:i] + ltr + anything[i+1:], r))
+                discards.append((AT_MOST, ltr, lc - 1, ((".*" + ltr)*lc) + ".*", r))
+                cons._ban(i, ltr)
+                cons._at_most(ltr, lc - 1)
+                toomany.add(ltr)
+        else:
+            # ltr is not at all in the solution
+            if (lcounters[ltr] == 1):
+                # First time we see this letter in the guess, so do filter it out
+                rules.append("-" + ltr + "*  :  Discard any words that contain '" + ltr + "' anywhere.")
+                discards.append((AT_MOST, ltr, 0, ".*" + ltr + ".*", len(rules) - 1))
+                cons._at_most(ltr, 0)
+
+    # Ordered filtering steps, with the messages the helper shows for them
+    steps = cons.steps
+    step_rules = cons.step_rules
+    if fixed:
+        pattern = list(anything)
+        for i, ltr in fixed:
+            pattern[i] = ltr
+        steps.append((FIXED, tuple(fixed), None, "\tKeeping only words matching: " + "".join(pattern)))
+        step_rules.append(0)
+    for kind, a, b, pattern, r in discards:
+        steps.append((kind, a, b, "\tDiscarding words matching:   '" + pattern + "'"))
+        step_rules.append(r)
+    for kind, a, b, pattern, r in keeps:
+        steps.append((kind, a, b, "\tKeeping words matching:      '" + pattern + "'"))
+        step_rules.append(r)
+    return cons
+
+
+# Letter count conditions in queries, longest first for matching
+QUERY_OPS = ("<=", ">=", "=", "<", ">")
+
+
+def parse_query(text, wlen, abc):
+    """
+    Compile a query over a word list into a Constraint (with only slots
+    and letter counts, no rules or steps), raising ValueError if it is
+    not valid. A query is a number of terms separated by spaces or
+    commas, all of which words must satisfy:
+
+        s?a?e   : pattern with a letter, or '?' (or '.') for any letter,
+                  in each slot, or between brackets the letters allowed
+                  in it, e.g. [aeiou], or not allowed, e.g. [^s]
+        -rt     : no 'r' nor 't' anywhere
+        +ae     : 'a' and 'e' somewhere
+        e>=2    : at least two 'e's (also e<=N, e=N, e<N and e>N)
+
+    e.g. "s?a?e -r e>=2" for s?a?e words with no r and at least two e's.
+    """
+    cons = Constraint(wlen, abc)
+    abc = cons.abc
+    have_pattern = False
+    for term in text.lower().replace(",", " ").split():
+        op = next((op for op in QUERY_OPS if op in term), None)
+        if op is not None:
+            ltr, _, n = term.partition(op)
+            if len(ltr) != 1 or ltr not in abc or not n.isdecimal():
+                raise ValueError("invalid letter count '" + term + "'")
+            n = int(n)
+            if op == "<" and n == 0:
+                raise ValueError("invalid letter count '" + term + "'")
+            if op in ("<=", "="):
+                cons._at_most(ltr, n)
+            elif op == "<":
+                cons._at_most(ltr, n - 1)
+            if op in (">=", "="):
+                cons._at_least(ltr, n)
+            elif op == ">":
+                cons._at_least(ltr, n + 1)
+        elif term[0] in "-+":
+            letters = term[1:]
+            if letters == "" or not set(letters) <= abc:
+                raise ValueError("invalid letters in '" + term + "'")
+            for ltr in letters:
+                if term[0] == "-":
+                    cons._at_most(ltr, 0)
+                else:
+                    cons._at_least(ltr, 1)
+        else:
+            if have_pattern:
+                raise ValueError("more than one pattern in the query")
+            have_pattern = True
+            slots = []
+            pos = 0
+            while pos < len(term):
+                if term[pos] == "[":
+                    end = term.find("]", pos)
+                    if end < 0:
+                        raise ValueError("missing ']' in '" + term + "'")
+                    letters = term[pos + 1:end]
+                    negated = letters.startswith("^")
+                    if negated:
+                        letters = letters[1:]
+                    if not set(letters) <= abc:
+                        raise ValueError("invalid letters in '" + term + "'")
+                    slots.append(abc - set(letters) if negated else frozenset(letters))
+                    pos = end + 1
+                else:
+                    ltr = term[pos]
+                    if ltr in "?.":
+                        slots.append(abc)
+                    elif ltr in abc:
+                        slots.append(frozenset(ltr))
+                    else:
+                        raise ValueError("invalid character '" + ltr + "' in '" + term + "'")
+                    pos += 1
+            if len(slots) != wlen:
+                raise ValueError("pattern '{0}' does not have {1} slots".format(term, wlen))
+            cons.slots = [frozenset(allowed) for allowed in slots]
+            cons._checks = None
+    return cons
+
+
+class SetEngine:
+    """
+    Candidate words kept as plain python sets. A candidate state is a
+    set of words, never modified once created.
+    """
+    name = "set"
+
+    def __init__(self, words, abc_str):
+        self.word_set = frozenset(words)
+        self.wordlist = sorted(words)
+        self.index = dict((w, i) for i, w in enumerate(self.wordlist))
+
+    def start(self):
+        return self.word_set
+
+    def count(self, state):
+        return len(state)
+
+    def contains(self, state, word):
+        return word in state
+
+    def minus(self, state, other):
+        """State with the words in state but not in other."""
+        return state - other
+
+    def words(self, state, ordered=True, limit=None):
+        if limit is not None:
+            return heapq.nsmallest(limit, state)
+        return sorted(state) if ordered else list(state)
+
+    def to_bytes(self, state):
+        """State as a little-endian bitset over the sorted word list."""
+        index = self.index
+        bits = 0
+        for w in state:
+            bits |= 1 << index[w]
+        return bits.to_bytes((len(self.wordlist) + 7) // 8, "little")
+
+    def from_bytes(self, data):
+        bits = int.from_bytes(data, "little")
+        return frozenset(w for i, w in enumerate(self.wordlist) if (bits >> i) & 1)
+
+    def filter(self, state, cons):
+        return cons.filter(state)
+
+    def filter_steps(self, state, cons):
+        return cons.filter_steps(state)
+
+
+class NumpyEngine:
+    """
+    Candidate words kept as rows of an (N, wlen) uint8 matrix with the
+    code of the letter in each slot, plus an (N, len(abc)) matrix with
+    the number of times each letter appears in each word. A candidate
+    state is a boolean mask over the rows, never modified once created.
+    """
+    name = "numpy"
+
+    def __init__(self, words, abc_str):
+        have_numpy()
+        self.wordlist = sorted(words)
+        self.index = dict((w, i) for i, w in enumerate(self.wordlist))
+        self.codes = dict((ltr, i) for i, ltr in enumerate(abc_str))
+        nwords = len(self.wordlist)
+        wlen = len(self.wordlist[0]) if nwords > 0 else 0
+        flat = [self.codes[ltr] for w in self.wordlist for ltr in w]
+        self.letters = numpy.array(flat, dtype=numpy.uint8).reshape(nwords, wlen)
+        self.counts = numpy.zeros((nwords, len(abc_str)), dtype=numpy.uint8)
+        rows = numpy.arange(nwords)
+        for i in range(wlen):
+            numpy.add.at(self.counts, (rows, self.letters[:, i]), 1)
+
+    def start(self):
+        return numpy.ones(len(self.wordlist), dtype=bool)
+
+    def count(self, state):
+        return int(numpy.count_nonzero(state))
+
+    def contains(self, state, word):
+        i = self.index.get(word)
+        return i is not None and bool(state[i])
+
+    def minus(self, state, other):
+        return state & ~other
+
+    def words(self, state, ordered=True, limit=None):
+        wordlist = self.wordlist
+        return [wordlist[i] for i in numpy.flatnonzero(state)[0:limit]]
+
+    def to_bytes(self, state):
+        """State as a little-endian bitset over the sorted word list."""
+        return numpy.packbits(state, bitorder="little").tobytes()
+
+    def from_bytes(self, data):
+        bits = numpy.unpackbits(numpy.frombuffer(data, dtype=numpy.uint8), bitorder="little")
+        return bits[:len(self.wordlist)].astype(bool)
+
+    def _count_of(self, ltr):
+        c = self.codes.get(ltr)
+        if c is None:
+            return numpy.zeros(len(self.wordlist), dtype=numpy.uint8)
+        return self.counts[:, c]
+
+    def _step_mask(self, kind, a, b):
+        if kind == FIXED:
+            mask = numpy.ones(len(self.wordlist), dtype=bool)
+            for i, ltr in a:
+                mask &= self.letters[:, i] == self.codes.get(ltr, -1)
+            return mask
+        if kind == NOT_AT:
+            return self.letters[:, a] != self.codes.get(b, -1)
+        if kind == AT_MOST:
+            return self._count_of(a) <= b
+        return self._count_of(a) >= b
+
+    def filter(self, state, cons):
+        mask = state.copy()
+        for i in range(cons.wlen):
+            allowed = numpy.zeros(len(self.codes), dtype=bool)
+            for ltr in cons.slots[i]:
+                c = self.codes.get(ltr)
+                if c is not None:
+                    allowed[c] = True
+            mask &= allowed[self.letters[:, i]]
+        for ltr, n in cons.min_counts.items():
+            mask &= self._count_of(ltr) >= n
+        for ltr, n in cons.max_counts.items():
+            mask &= self._count_of(ltr) <= n
+        return mask
+
+    def filter_steps(self, state, cons):
+        mask = state
+        remaining = []
+        for kind, a, b, _ in cons.steps:
+            mask = mask & self._step_mask(kind, a, b)
+            remaining.append(int(numpy.count_nonzero(mask)))
+        return mask, remaining
+
+
+class BitsetEngine:
+    """
+    Candidate words kept as bits of a python int, bit i standing for
+    the i-th word in alphabetical order, with an inverted index of
+    bitsets: one for each (slot, letter), with the words having that
+    letter in that slot, and one for each (letter, k), with the words
+    having at least k repetitions of that letter. Each filtering rule
+    then becomes a single AND, or AND-NOT, of wide integers.
+    """
+    name = "bitset"
+
+    def __init__(self, words, abc_str):
+        self.wordlist = sorted(words)
+        self.index = dict((w, i) for i, w in enumerate(self.wordlist))
+        nwords = len(self.wordlist)
+        wlen = len(self.wordlist[0]) if nwords > 0 else 0
+        letters = set(abc_str)
+        for w in self.wordlist:
+            letters.update(w)
+        self.slot_bits = dict()
+        self.count_bits = dict()
+        latin1 = all(ord(ltr) < 256 for ltr in letters)
+        for i in range(wlen):
+            # All letters in slot i, last word first, mapped to a
+            # string of binary digits for each letter
+            column = "".join(w[i] for w in reversed(self.wordlist))
+            if latin1:
+                column = column.encode("latin-1")
+            for ltr in letters:
+                if latin1:
+                    code = ord(ltr)
+                    if code not in column:
+                        continue
+                    table = bytes.maketrans(bytes(range(256)),
+                        bytes(0x31 if x == code else 0x30 for x in range(256)))
+                else:
+                    if ltr not in column:
+                        continue
+                    table = dict((ord(x), "1" if x == ltr else "0") for x in letters)
+                self.slot_bits[(i, ltr)] = int(column.translate(table), 2)
+        self.all = (1 << nwords) - 1
+        for ltr in letters:
+            at_least = self._repetition_bits(self.all,
+                [self.slot_bits.get((i, ltr), 0) for i in range(wlen)])
+            for k in range(1, len(at_least)):
+                if at_least[k] != 0:
+                    self.count_bits[(ltr, k)] = at_least[k]
+
+    @staticmethod
+    def _repetition_bits(all_bits, slot_bits):
+        """
+        List with the bitset of the words having at least k repetitions
+        of a letter at index k, from the bitsets of the words having it
+        in each slot, combined one slot at a time.
+        """
+        at_least = [all_bits]
+        for bits in slot_bits:
+            if bits == 0:
+                continue
+            at_least.append(0)
+            for k in range(len(at_least) - 1, 0, -1):
+                at_least[k] |= at_least[k - 1] & bits
+        return at_least
+
+    def _slot(self, i, ltr):
+        """Bitset of the words with ltr in slot i."""
+        return self.slot_bits.get((i, ltr), 0)
+
+    def _at_least(self, ltr, n):
+        """Bitset of the words with at least n (> 0) repetitions of ltr."""
+        return self.count_bits.get((ltr, n), 0)
+
+    def start(self):
+        return self.all
+
+    def count(self, state):
+        return state.bit_count()
+
+    def contains(self, state, word):
+        i = self.index.get(word)
+        return i is not None and (state >> i) & 1 == 1
+
+    def minus(self, state, other):
+        return state & ~other
+
+    def words(self, state, ordered=True, limit=None):
+        wordlist = self.wordlist
+        if limit is not None:
+            # Only the lowest bits, one at a time
+            words = []
+            while state and len(words) < limit:
+                low = state & -state
+                words.append(wordlist[low.bit_length() - 1])
+                state ^= low
+            return words
+        bits = bin(state)[:1:-1]    # Lowest bit (first word) first
+        words = []
+        i = bits.find("1")
+        while i >= 0:
+            words.append(wordlist[i])
+            i = bits.find("1", i + 1)
+        return words
+
+    def to_bytes(self, state):
+        """State as a little-endian bitset over the sorted word list."""
+        return state.to_bytes((len(self.wordlist) + 7) // 8, "little")
+
+    def from_bytes(self, data):
+        return int.from_bytes(data, "little")
+
+    def _apply(self, state, kind, a, b):
+        if kind == FIXED:
+            for i, ltr in a:
+                state &= self._slot(i, ltr)
+        elif kind == NOT_AT:
+            state &= ~self._slot(a, b)
+        elif kind == AT_MOST:
+            state &= ~self._at_least(a, b + 1)
+        elif b > 0:
+            state &= self._at_least(a, b)
+        return state
+
+    def filter(self, state, cons):
+        for i, allowed in enumerate(cons.slots):
+            if len(allowed) == 1:
+                state &= self.slot_bits.get((i, next(iter(allowed))), 0)
+            else:
+                for ltr in cons.abc - allowed:
+                    state &= ~self.slot_bits.get((i, ltr), 0)
+        for ltr, n in cons.min_counts.items():
+            state = self._apply(state, AT_LEAST, ltr, n)
+        for ltr, n in cons.max_counts.items():
+            state = self._apply(state, AT_MOST, ltr, n)
+        return state
+
+    def filter_steps(self, state, cons):
+        remaining = []
+        for kind, a, b, _ in cons.steps:
+            state = self._apply(state, kind, a, b)
+            remaining.append(state.bit_count())
+        return state, remaining
+
+
+# PackedEngine checks letter counts word by word once no more than
+# 1/2**SPARSE_SHIFT of the list is left, instead of with bitsets
+SPARSE_SHIFT = 5
+
+
+class PackedEngine(BitsetEngine):
+    """
+    A BitsetEngine over a PackedWords instead of an index of bitsets:
+    the bitsets a constraint needs are computed at filtering time
+    straight from the letter codes of each slot (a bytes.translate and
+    an int(..., 2) per slot and letter), so memory stays close to wlen
+    bytes per word.
+    """
+    name = "packed"
+
+    def __init__(self, words, abc_str):
+        if not isinstance(words, PackedWords):
+            words = PackedWords.from_words(words)
+        self.wordlist = words
+        self.nwords = len(words)
+        self.all = (1 << self.nwords) - 1
+
+    def contains(self, state, word):
+        i = self.wordlist.index_of(word)
+        return i >= 0 and (state >> i) & 1 == 1
+
+    def _slot_bits(self, i, letters):
+        """Bitset of the words with any of letters in slot i."""
+        codes = self.wordlist.codes
+        table = bytearray(b"0" * 256)
+        for ltr in letters:
+            c = codes.get(ltr)
+            if c is not None:
+                table[c] = 0x31
+        return int(self.wordlist.columns[i][::-1].translate(table), 2)
+
+    def _slot(self, i, ltr):
+        return self._slot_bits(i, ltr)
+
+    def _at_least(self, ltr, n):
+        at_least = self._repetition_bits(self.all,
+            [self._slot_bits(i, ltr) for i in range(self.wordlist.wlen)])
+        return at_least[n] if n < len(at_least) else 0
+
+    def filter(self, state, cons):
+        present = self.wordlist.letters
+        # Letters allowed at most 0 times are dropped in the slot pass
+        absent = set(ltr for ltr, n in cons.max_counts.items() if n == 0)
+        for i in range(cons.wlen):
+            allowed = cons.slots[i] - absent if absent else cons.slots[i]
+            if all(ltr in allowed for ltr in present):
+                continue
+            state &= self._slot_bits(i, allowed)
+            if state == 0:
+                return 0
+        counts = [(ltr, cons.min_counts.get(ltr, 0), cons.max_counts.get(ltr, self.wordlist.wlen))
+            for ltr in set(cons.min_counts) | set(cons.max_counts) if ltr not in absent]
+        if not counts:
+            return state
+        if state.bit_count() <= self.nwords >> SPARSE_SHIFT:
+            # Few words left, cheaper to check them one by one
+            return self._filter_counts_sparse(state, counts)
+        for ltr, least, most in counts:
+            if least > 0:
+                state &= self._at_least(ltr, least)
+            if most < self.wordlist.wlen:
+                state &= ~self._at_least(ltr, most + 1)
+        return state
+
+    def _filter_counts_sparse(self, state, counts):
+        wordlist = self.wordlist
+        bits = bin(state)[:1:-1]    # Lowest bit (first word) first
+        kept = bytearray(b"0" * len(bits))
+        i = bits.find("1")
+        while i >= 0:
+            w = wordlist[i]
+            for ltr, least, most in counts:
+                if not least <= w.count(ltr) <= most:
+                    break
+            else:
+                kept[i] = 0x31
+            i = bits.find("1", i + 1)
+        kept.reverse()
+        return int(kept, 2)
+
+
+ENGINES = {"bitset": BitsetEngine, "set": SetEngine, "numpy": NumpyEngine,
+           "packed": PackedEngine}
+
+
+class PackedWords:
+    """
+    Sorted sequence of distinct words of the same length, stored with
+    one byte per letter (the rank of the letter in code point order)
+    in one bytes object per slot, so a word takes wlen bytes instead
+    of the 50+ of a str in a set. Words are decoded only when accessed.
+    """
+    __slots__ = ("letters", "codes", "columns", "nwords", "wlen")
+
+    def __init__(self, letters, columns):
+        self.letters = letters
+        self.codes = dict((ltr, c) for c, ltr in enumerate(letters))
+        self.columns = columns
+        self.wlen = len(columns)
+        self.nwords = len(columns[0]) if columns else 0
+
+    @classmethod
+    def from_rows(cls, letters, rows, wlen):
+        """From a bytearray with the codes of every word, one after the other."""
+        nwords = len(rows) // wlen
+        ordered = all(rows[j - wlen:j] < rows[j:j + wlen] for j in range(wlen, len(rows), wlen))
+        if not ordered:
+            # Sort and deduplicate (only now with an object per word)
+            unique = sorted(set(bytes(rows[j:j + wlen]) for j in range(0, len(rows), wlen)))
+            rows = bytearray(b"".join(unique))
+            nwords = len(unique)
+        columns = [bytes(rows[i::wlen]) for i in range(wlen)] if nwords > 0 else []
+        return cls(letters, columns)
+
+    @classmethod
+    def from_words(cls, words):
+        words = set(words)
+        letters = "".join(sorted(set("".join(words))))
+        wlen = len(next(iter(words), ""))
+        codes = dict((ltr, c) for c, ltr in enumerate(letters))
+        rows = bytearray(codes[ltr] for w in sorted(words) for ltr in w)
+        return cls(letters, [bytes(rows[i::wlen]) for i in range(wlen)] if words else [])
+
+    def __len__(self):
+        return self.nwords
+
+    def __getitem__(self, i):
+        letters = self.letters
+        return "".join(letters[col[i]] for col in self.columns)
+
+    def __iter__(self):
+        letters = self.letters
+        for codes in zip(*self.columns):
+            yield "".join(letters[c] for c in codes)
+
+    def lines_utf8(self):
+        """All words, each followed by a newline, utf-8 encoded."""
+        letters = self.letters
+        if any(ord(ltr) > 255 for ltr in letters):
+            return "".join(w + "\n" for w in self).encode("utf-8")
+        table = bytearray(256)
+        for c, ltr in enumerate(letters):
+            table[c] = ord(ltr)
+        step = self.wlen + 1
+        text = bytearray(b"\n" * (self.nwords * step))
+        for i, col in enumerate(self.columns):
+            text[i::step] = col.translate(table)
+        return text.decode("latin-1").encode("utf-8")
+
+    def encode(self, word):
+        """Word as bytes of letter codes, or None if it has unknown letters."""
+        try:
+            return bytes(self.codes[ltr] for ltr in word)
+        except KeyError:
+            return None
+
+    def index_of(self, word):
+        """Position of word in the sequence (binary search), or -1."""
+        key = self.encode(word) if len(word) == self.wlen else None
+        if key is None:
+            return -1
+        columns = self.columns
+        lo, hi = 0, self.nwords
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if bytes(col[mid] for col in columns) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.nwords and bytes(col[lo] for col in columns) == key:
+            return lo
+        return -1
+
+    def __contains__(self, word):
+        return self.index_of(word) >= 0
+
+
+def read_wordlist_packed(fname, wlen, abc_str):
+    """
+    Same as read_wordlist, but streaming the words straight into a
+    PackedWords, for lists too large to be held as a set of strings.
+    """
+    rows = bytearray()
+    # Letters are stored by their latin-1 code while possible, and
+    # otherwise by codes given in order of appearance
+    provisional = None
+    with open(fname) as wordlist_lines:
+        for line in wordlist_lines:
+            li = line.strip()
+            if li.startswith("#"):
+                continue
+            for word in li.split():
+                if len(word) != wlen:
+                    continue
+                word = word.lower()
+                if provisional is None:
+                    try:
+                        rows.extend(word.encode("latin-1"))
+                        continue
+                    except UnicodeEncodeError:
+                        found = sorted((rows.find(bytes((c,))), c) for c in range(256) if c in rows)
+                        provisional = dict((chr(c), n) for n, (pos, c) in enumerate(found))
+                        table = bytearray(256)
+                        for ltr, n in provisional.items():
+                            table[ord(ltr)] = n
+                        rows = rows.translate(table)
+                for letter in word:
+                    if letter not in provisional:
+                        if len(provisional) == 256:
+                            raise ValueError("more than 256 different letters in '" + fname + "'")
+                        provisional[letter] = len(provisional)
+                rows.extend([provisional[letter] for letter in word])
+    if provisional is None:
+        provisional = dict((chr(c), c) for c in range(256) if c in rows)
+    # Extend abc_str with any new letters in order of appearance
+    abc = set(abc_str)
+    for pos, ltr in sorted((rows.find(bytes((c,))), ltr) for ltr, c in provisional.items()):
+        if ltr not in abc:
+            abc.add(ltr)
+            abc_str = abc_str + ltr
+    # Renumber the letters by code point, so byte order is word order
+    letters = "".join(sorted(provisional))
+    table = bytearray(range(256))
+    for c, ltr in enumerate(letters):
+        table[provisional[ltr]] = c
+    rows = rows.translate(table)
+    return PackedWords.from_rows(letters, rows, wlen), abc_str
+
+
+def make_engine(name, words, abc_str):
+    """
+    Create the named engine over words, falling back to the bitset
+    engine when numpy is requested but not installed.
+    """
+    if name == "numpy" and not have_numpy():
+        print("Warning: numpy is not installed, using the bitset engine instead.")
+        name = "bitset"
+    return ENGINES[name](words, abc_str)
+
+
+def feedback_codes(letters, counts, guess_codes):
+    """
+    Vectorized feedback: base-3 clue codes for one guess (given as a
+    sequence of letter codes) against every row of the letters matrix.
+    """
+    wlen = len(guess_codes)
+    nwords = letters.shape[0]
+    code = numpy.zeros(nwords, dtype=numpy.int32)
+    green = letters == numpy.asarray(guess_codes, dtype=letters.dtype)
+    available = dict()
+    for c in set(guess_codes):
+        available[c] = counts[:, c].astype(numpy.int16)
+    for i in range(wlen):
+        available[guess_codes[i]] -= green[:, i]
+        code += green[:, i] * (2 * 3**i)
+    for i in range(wlen):
+        avail = available[guess_codes[i]]
+        yellow = ~green[:, i] & (avail > 0)
+        avail -= yellow
+        code += yellow * 3**i
+    return code
+
+
+# Globals for the matrix building worker processes
+_fm_letters = None
+_fm_counts = None
+_fm_path = None
+_fm_dtype = None
+
+
+def _fm_init(letters, counts, path, dtype):
+    global _fm_letters, _fm_counts, _fm_path, _fm_dtype
+    have_numpy()
+    _fm_letters = letters
+    _fm_counts = counts
+    _fm_path = path
+    _fm_dtype = dtype
+
+
+def _fm_build_rows(bounds):
+    start, end = bounds
+    nwords = _fm_letters.shape[0]
+    matrix = numpy.memmap(_fm_path, dtype=_fm_dtype, mode="r+", shape=(nwords, nwords))
+    for g in range(start, end):
+        matrix[g] = feedback_codes(_fm_letters, _fm_counts, tuple(_fm_letters[g]))
+    matrix.flush()
+    del matrix
+    return end - start
+
+
+class FeedbackMatrix:
+    """
+    Precomputed feedback codes for every guess (row) and answer
+    (column) in a word list, both in sorted order. Codes are stored as
+    uint8 for words of up to 5 letters, and as uint16 for up to 10.
+    The cache file is keyed by the hash of the word list and wlen.
+    """
+
+    def __init__(self, words, cache_dir=CACHE_DIR, list_hash=None):
+        have_numpy()
+        self.wordlist = sorted(words)
+        self.index = dict((w, i) for i, w in enumerate(self.wordlist))
+        self.wlen = len(self.wordlist[0]) if self.wordlist else 0
+        if 3**self.wlen <= 256:
+            self.dtype = numpy.uint8
+        elif 3**self.wlen <= 65536:
+            self.dtype = numpy.uint16
+        else:
+            raise ValueError("feedback matrix only supports words of up to 10 letters")
+        self.key = "{0}_{1}".format(self.wlen, list_hash or wordlist_hash(self.wordlist))
+        ext = "u8" if self.dtype == numpy.uint8 else "u16"
+        self.path = os.path.join(cache_dir, "feedback_" + self.key + "." + ext)
+        self.matrix = None
+
+    def exists(self):
+        return os.path.isfile(self.path)
+
+    def build(self, abc_str, nworkers=None):
+        """Compute the whole matrix in parallel and write the cache file."""
+        nwords = len(self.wordlist)
+        engine = NumpyEngine(self.wordlist, abc_str)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp." + str(os.getpid())
+        matrix = numpy.memmap(tmp_path, dtype=self.dtype, mode="w+", shape=(nwords, nwords))
+        del matrix
+        nworkers = worker_count(nworkers)
+        chunk = max(1, min(512, nwords // (4 * nworkers) + 1))
+        bounds = [(s, min(s + chunk, nwords)) for s in range(0, nwords, chunk)]
+        initargs = (engine.letters, engine.counts, tmp_path, self.dtype)
+        for _ in parallel_map(_fm_build_rows, bounds, nworkers, _fm_init, initargs):
+            pass
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        nwords = len(self.wordlist)
+        self.matrix = numpy.memmap(self.path, dtype=self.dtype, mode="r", shape=(nwords, nwords))
+
+    def has(self, guess):
+        return guess in self.index
+
+    def row(self, guess):
+        return self.matrix[self.index[guess]]
+
+    def filter(self, mask, guess, clues):
+        """Keep only words in mask for which guess gets exactly these clues."""
+        return mask & (self.row(guess) == clues_code(clues))
+
+
+METRICS = ("entropy", "size")
+
+# Below this many guess/answer pairs, ranking is done in-process
+POOL_MIN_PAIRS = 200000
+# Guesses scored between checks for a request to stop ranking
+STOP_CHUNK = 64
+
+class GuessScorer:
+    """
+    Scores guesses by how they split a fixed list of answers, with the
+    precomputed feedback matrix, numpy, or plain python, whichever is
+    available. Instances are never modified, so rankings can safely
+    run in several threads at once.
+    """
+
+    def __init__(self, answers, abc_str, metric, matrix_path, matrix_dtype, matrix_n, columns):
+        self.answers = answers
+        self.metric = metric
+        self.matrix = None
+        self.letters = None
+        if not have_numpy():
+            return
+        if matrix_path is not None:
+            self.matrix = numpy.memmap(matrix_path, dtype=matrix_dtype, mode="r", shape=(matrix_n, matrix_n))
+            self.columns = numpy.asarray(columns)
+        else:
+            engine = NumpyEngine(answers, abc_str)
+            # Keep answers in the order given, not sorted
+            self.letters = engine.letters[[engine.index[w] for w in answers]]
+            self.counts = engine.counts[[engine.index[w] for w in answers]]
+            self.codes = engine.codes
+
+    def score(self, sizes, nanswers):
+        """Score from the sizes of the groups answers are split into."""
+        if self.metric == "entropy":
+            return math.log2(nanswers) - sum(c * math.log2(c) for c in sizes if c > 1) / nanswers
+        return sum(c * c for c in sizes) / nanswers
+
+    def score_chunk(self, chunk):
+        nanswers = len(self.answers)
+        results = []
+        for guess, row in chunk:
+            if self.matrix is not None:
+                codes = self.matrix[row][self.columns]
+                sizes = numpy.bincount(codes).tolist()
+            elif self.letters is not None:
+                gcodes = tuple(self.codes[ltr] if ltr in self.codes else 255 for ltr in guess)
+                codes = feedback_codes(self.letters, self.counts, gcodes)
+                sizes = numpy.bincount(codes).tolist()
+            else:
+                groups = dict()
+                for answer in self.answers:
+                    fb = feedback(guess, answer)
+                    groups[fb] = groups.get(fb, 0) + 1
+                sizes = groups.values()
+            results.append((guess, self.score(sizes, nanswers)))
+        return results
+
+
+# Scorer of each guess ranking worker process
+_rg_scorer = None
+
+
+def _rg_init(*args):
+    global _rg_scorer
+    _rg_scorer = GuessScorer(*args)
+
+
+def _rg_score_chunk(chunk):
+    return _rg_scorer.score_chunk(chunk)
+
+
+def rank_guesses(guesses, answers, abc_str, metric="entropy", nworkers=None, fbmatrix=None, stop=None):
+    """
+    Score every guess against the remaining answers, returning a list
+    of (guess, score) with the best guesses first. Higher is better for
+    'entropy' (expected bits of information), lower is better for
+    'size' (expected number of remaining words.) Ties favour guesses
+    that could still be the solution.
+
+    With stop (a threading.Event), ranking is done in-process and is
+    abandoned as soon as stop is set, returning None.
+    """
+    answers = sorted(answers)
+    guesses = sorted(guesses)
+    if len(answers) == 0:
+        return []
+    matrix_args = (None, None, 0, None)
+    if fbmatrix is not None and fbmatrix.matrix is not None \
+            and all(fbmatrix.has(w) for w in answers):
+        rows = [fbmatrix.index.get(g) for g in guesses]
+        if None not in rows:
+            columns = [fbmatrix.index[w] for w in answers]
+            matrix_args = (fbmatrix.path, fbmatrix.dtype, len(fbmatrix.wordlist), columns)
+    else:
+        rows = [None] * len(guesses)
+    items = list(zip(guesses, rows))
+    initargs = (answers, abc_str, metric) + matrix_args
+    nworkers = worker_count(nworkers)
+    if stop is not None:
+        scorer = GuessScorer(*initargs)
+        scores = []
+        for s in range(0, len(items), STOP_CHUNK):
+            if stop.is_set():
+                return None
+            scores.extend(scorer.score_chunk(items[s:s + STOP_CHUNK]))
+    elif nworkers == 1 or len(guesses) * len(answers) < POOL_MIN_PAIRS:
+        scores = GuessScorer(*initargs).score_chunk(items)
+    else:
+        chunk = max(1, len(items) // (8 * nworkers) + 1)
+        chunks = [items[s:s + chunk] for s in range(0, len(items), chunk)]
+        scores = []
+        for part in parallel_map(_rg_score_chunk, chunks, nworkers, _rg_init, initargs):
+            scores.extend(part)
+    candidate = set(answers)
+    sign = -1 if metric == "entropy" else 1
+    scores.sort(key=lambda gs: (sign * gs[1], gs[0] not in candidate, gs[0]))
+    return scores
+
+
+def first_guess_ranking(words, abc_str, metric="entropy", nworkers=None, fbmatrix=None,
+        cache_dir=CACHE_DIR, list_hash=None):
+    """
+    Ranking of first guesses for a whole word list, the most expensive
+    case, cached in a text file keyed by the hash of the list and wlen
+    (list_hash, if already known.)
+    """
+    wordlist = sorted(words)
+    key = "{0}_{1}".format(len(wordlist[0]) if wordlist else 0,
+        list_hash or wordlist_hash(wordlist))
+    path = os.path.join(cache_dir, "first_" + metric + "_" + key + ".txt")
+    if os.path.isfile(path):
+        ranking = []
+        with open(path) as cached:
+            for line in cached:
+                guess, score = line.split()
+                ranking.append((guess, float(score)))
+        return ranking
+    ranking = rank_guesses(wordlist, wordlist, abc_str, metric, nworkers, fbmatrix)
+    os.makedirs(cache_dir, exist_ok=True)
+    tmp_path = path + ".tmp." + str(os.getpid())
+    with open(tmp_path, "w") as cached:
+        for guess, score in ranking:
+            cached.write("{0} {1!r}\n".format(guess, score))
+    os.replace(tmp_path, path)
+    return ranking
+
+
+class PrefixCache:
+    """
+    LRU cache of candidate states, keyed by the word list's hash, the
+    word length, the engine, and the ordered sequence of (guess, clues)
+    attempts leading to the state. Most games start with one of a few
+    openers, so sessions replaying the same prefix share its result
+    instead of filtering the list again.
+
+    States are kept in memory up to a total of max_bytes, as measured
+    by sys.getsizeof (plus ENTRY_OVERHEAD for each entry's key), since
+    their size depends on the engine: a bitset state takes at most one
+    bit per word, but a set state is a whole hash table. With disk_dir,
+    states reached in up to disk_depth attempts are also saved there,
+    engine independently, so the common opening states survive
+    restarts, keeping at most disk_max_files of them (those least
+    recently used, by mtime, are removed.) States that cannot be saved
+    (e.g. on a read-only or full disk) are only kept in memory.
+    """
+    # Approximate bytes taken by the key and the bookkeeping of an entry
+    ENTRY_OVERHEAD = 256
+
+    def __init__(self, max_bytes=64 << 20, disk_dir=None, disk_depth=2, disk_max_files=512):
+        from collections import OrderedDict
+        self.entries = OrderedDict()
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.disk_dir = disk_dir
+        self.disk_depth = disk_depth
+        self.disk_max_files = disk_max_files
+        # Names of the files in disk_dir, least recently used first,
+        # listed on first use
+        self.disk_files = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_errors = 0
+
+    def _disk_name(self, index, attempts):
+        key = "{0}_{1}_".format(index.wlen, index.list_hash) + \
+            " ".join(guess + ":" + clues for guess, clues in attempts)
+        return hashlib.sha1(key.encode("utf-8")).hexdigest() + ".bits"
+
+    def _list_disk_files(self):
+        from collections import OrderedDict
+        files = []
+        try:
+            with os.scandir(self.disk_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".bits"):
+                        try:
+                            files.append((entry.stat().st_mtime_ns, entry.name))
+                        except OSError:
+                            pass
+        except OSError:
+            pass
+        files.sort()
+        self.disk_files = OrderedDict((name, None) for mtime, name in files)
+
+    def get(self, index, attempts):
+        """State after attempts (a tuple of (guess, clues)), or None."""
+        key = (index.list_hash, index.wlen, index.engine.name, attempts)
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        if self.disk_dir is not None and len(attempts) <= self.disk_depth:
+            name = self._disk_name(index, attempts)
+            path = os.path.join(self.disk_dir, name)
+            try:
+                with open(path, "rb") as f:
+                    state = index.engine.from_bytes(f.read())
+                # (Marked as recently used, for other processes too)
+                os.utime(path)
+            except OSError:
+                pass
+            else:
+                if self.disk_files is None:
+                    self._list_disk_files()
+                self.disk_files[name] = None
+                self.disk_files.move_to_end(name)
+                self.disk_hits += 1
+                self._store(key, state)
+                return state
+        self.misses += 1
+        return None
+
+    def put(self, index, attempts, state):
+        self._store((index.list_hash, index.wlen, index.engine.name, attempts), state)
+        if self.disk_dir is not None and len(attempts) <= self.disk_depth:
+            name = self._disk_name(index, attempts)
+            path = os.path.join(self.disk_dir, name)
+            if not os.path.isfile(path):
+                tmp_path = path + ".tmp." + str(os.getpid())
+                try:
+                    os.makedirs(self.disk_dir, exist_ok=True)
+                    with open(tmp_path, "wb") as f:
+                        f.write(index.engine.to_bytes(state))
+                    os.replace(tmp_path, path)
+                except OSError:
+                    # (Read-only or full disk: the state is still kept in memory)
+                    self.disk_errors += 1
+                    try:
+                        os.remove(tmp_path)
+                    except OSError:
+                        pass
+                    return
+                if self.disk_files is None:
+                    self._list_disk_files()
+                self.disk_files[name] = None
+                self.disk_files.move_to_end(name)
+                while len(self.disk_files) > self.disk_max_files:
+                    oldest, _ = self.disk_files.popitem(last=False)
+                    try:
+                        os.remove(os.path.join(self.disk_dir, oldest))
+                    except OSError:
+                        pass
+
+    def _store(self, key, state):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.nbytes -= old[1]
+        size = sys.getsizeof(state) + self.ENTRY_OVERHEAD
+        self.entries[key] = (state, size)
+        self.nbytes += size
+        while self.nbytes > self.max_bytes and len(self.entries) > 1:
+            oldest_key, (oldest, oldest_size) = self.entries.popitem(last=False)
+            self.nbytes -= oldest_size
+            self.evictions += 1
+
+    def stats(self):
+        return {"entries": len(self.entries), "bytes": self.nbytes, "hits": self.hits,
+                "disk_hits": self.disk_hits, "misses": self.misses,
+                "evictions": self.evictions, "disk_errors": self.disk_errors}
+
+
+class WordIndex:
+    """
+    A word list loaded once, with its alphabet and a filtering engine
+    over it, shared (and never modified) by any number of sessions.
+    """
+
+    def __init__(self, words, abc_str, engine_name="bitset", wlen=None, list_hash=None):
+        # (PackedWords are kept as they are, to keep their memory savings)
+        self.words = words if isinstance(words, PackedWords) else frozenset(words)
+        self.abc_str = abc_str
+        self.abc = frozenset(abc_str)
+        self.wlen = wlen if wlen is not None else len(next(iter(self.words), ""))
+        self.engine = make_engine(engine_name, self.words, abc_str)
+        self.start = self.engine.start()
+        self.list_hash = list_hash or wordlist_hash(self.words)
+        # Optional PrefixCache shared by the sessions over this index
+        self.cache = None
+
+    @classmethod
+    def load(cls, fname, wlen=5, engine_name="bitset", abc_str=None):
+        if abc_str is None:
+            import string
+            abc_str = string.ascii_lowercase
+        list_hash = None
+        if engine_name == "packed":
+            words, abc_str = read_wordlist_packed(fname, wlen, abc_str)
+        else:
+            words, abc_str, list_hash = read_wordlist_cached(fname, wlen, abc_str)
+        return cls(words, abc_str, engine_name, wlen, list_hash)
+
+    def query(self, text, limit=None):
+        """
+        Words matching a query (see parse_query) as (count, words), in
+        alphabetical order and only the first limit of them if given.
+        """
+        cons = parse_query(text, self.wlen, self.abc)
+        state = self.engine.filter(self.start, cons)
+        return self.engine.count(state), self.engine.words(state, limit=limit)
+
+
+def read_corpus(fname, abc_str, buckets=None):
+    """
+    Read a word list with words of any length in a single pass, the
+    same way as read_wordlist does for one length, into a dict mapping
+    each word length to a [word_set, abc_str, abc] bucket, where abc_str
+    is extended only with the letters found in words of that length.
+    Buckets already in the given dict (e.g. from other files of the
+    same language) are added to.
+    """
+    if buckets is None:
+        buckets = dict()
+    with open(fname) as wordlist_lines:
+        for line in wordlist_lines:
+            li = line.strip()
+            if li.startswith("#"):
+                continue
+            for word in li.split():
+                bucket = buckets.get(len(word))
+                if bucket is None:
+                    bucket = buckets[len(word)] = [set(), abc_str, set(abc_str)]
+                word = word.lower()
+                bucket[0].add(word)
+                for letter in word:
+                    if letter not in bucket[2]:
+                        bucket[2].add(letter)
+                        bucket[1] = bucket[1] + letter
+    return buckets
+
+
+class Corpus:
+    """
+    Word lists for several languages and word lengths, for long-lived
+    processes serving games of any length. The files of a language are
+    read only once, the first time any length is asked for, bucketing
+    their words by length, and the WordIndex for each length is only
+    built the first time that length is asked for.
+
+        corpus = Corpus({"en": ["words_len5_en.txt", "words_len7_en.txt"]})
+        corpus.index("en", 7)  ->  WordIndex of the 7 letter words
+
+    Only the names in sources, and the word lengths found in their
+    files, can be asked for (index() raises ValueError for any other),
+    so that clients of a server cannot make it read other files, or
+    hold an index for every length they can think of.
+    """
+
+    def __init__(self, sources, engine_name="bitset", abc_str=None):
+        if abc_str is None:
+            import string
+            abc_str = string.ascii_lowercase
+        self.sources = dict(sources)
+        self.engine_name = engine_name
+        self.abc_str = abc_str
+        # Words not indexed yet: {name: {wlen: [word_set, abc_str, abc]}}
+        self.buckets = dict()
+        # Word lengths found in the files of each name read so far
+        self.found = dict()
+        self.indexes = dict()
+
+    def index(self, name, wlen):
+        key = (name, wlen)
+        index = self.indexes.get(key)
+        if index is None:
+            if name not in self.sources:
+                raise ValueError("unknown word list '" + str(name) + "'")
+            buckets = self.buckets.get(name)
+            if buckets is None:
+                buckets = dict()
+                for fname in self.sources[name]:
+                    read_corpus(fname, self.abc_str, buckets)
+                self.buckets[name] = buckets
+                self.found[name] = frozenset(buckets)
+            if wlen not in self.found[name]:
+                raise ValueError("no words of length {0} in word list '{1}' (lengths: {2})".format(
+                    wlen, name, ", ".join(str(n) for n in self.lengths(name))))
+            # The bucket is not needed anymore once indexed
+            words, abc_str, abc = buckets.pop(wlen)
+            index = WordIndex(words, abc_str, self.engine_name, wlen)
+            self.indexes[key] = index
+        return index
+
+    def lengths(self, name):
+        """Word lengths available for name (among those read so far.)"""
+        return sorted(self.found.get(name, ()))
+
+
+def check_guess(index, guess):
+    """Lowercased guess, or ValueError if it is not valid for the index."""
+    guess = guess.lower()
+    if len(guess) != index.wlen:
+        raise ValueError("guess '{0}' is not {1} characters long".format(guess, index.wlen))
+    if not set(guess) <= index.abc:
+        raise ValueError("invalid character in guess '" + guess + "'")
+    return guess
+
+
+def check_clues(index, clues):
+    """Lowercased clues, or ValueError if they are not valid for the index."""
+    clues = clues.lower()
+    if len(clues) != index.wlen:
+        raise ValueError("clues '{0}' are not {1} characters long".format(clues, index.wlen))
+    if not set(clues) <= set(CLUE_VALUES):
+        raise ValueError("invalid character in clues '" + clues + "'")
+    return clues
+
+
+class LetterStats:
+    """
+    Number of candidates having each letter in each slot, for ranking
+    the candidates by positional letter frequency: the score of a word
+    is the sum, over its slots, of the number of candidates sharing its
+    letter there.
+
+    The counts are kept up to date as the candidates change (by
+    filtering, or by undoing an attempt): only the words removed are
+    subtracted, and the words added back are added, unless fewer words
+    remain than changed, in which case those are just counted again.
+    """
+    __slots__ = ("engine", "state", "counts")
+
+    def __init__(self, engine, state):
+        self.engine = engine
+        self.state = state
+        self.counts = None
+        self._recount()
+
+    def _recount(self):
+        wordlist = self.engine.wordlist
+        wlen = len(wordlist[0]) if len(wordlist) > 0 else 0
+        self.counts = [dict() for i in range(wlen)]
+        self._add(self.engine.words(self.state, ordered=False), 1)
+
+    def _add(self, words, sign):
+        counts = self.counts
+        for w in words:
+            for i, ltr in enumerate(w):
+                slot = counts[i]
+                slot[ltr] = slot.get(ltr, 0) + sign
+
+    def update(self, state):
+        """Move on to the candidates in state."""
+        engine = self.engine
+        removed = engine.minus(self.state, state)
+        added = engine.minus(state, self.state)
+        nchanged = engine.count(removed) + engine.count(added)
+        self.state = state
+        if nchanged > engine.count(state):
+            self._recount()
+            return
+        self._add(engine.words(removed, ordered=False), -1)
+        self._add(engine.words(added, ordered=False), 1)
+
+    def score(self, word):
+        counts = self.counts
+        return sum(counts[i].get(ltr, 0) for i, ltr in enumerate(word))
+
+    def ranked(self, limit=None):
+        """
+        The candidates by decreasing score (alphabetically among equal
+        scores), only sorting the first limit of them if given.
+        """
+        words = self.engine.words(self.state, ordered=False)
+        key = lambda w: (-self.score(w), w)
+        if limit is not None and limit < len(words):
+            return heapq.nsmallest(limit, words, key=key)
+        return sorted(words, key=key)
+
+
+class WordleSession:
+    """
+    One game over a shared WordIndex. The history of attempts is kept
+    as an immutable linked list of (candidates, guess, clues, parent,
+    tree node) nodes, where candidate states are never modified once
+    created, so undo() and fork() are O(1) and forked sessions share
+    all the states they have in common. When following a decision tree
+    (see follow()), each node also has the node of the tree reached.
+
+        session = WordleSession(WordIndex.load("words_len5_en.txt"))
+        session.apply("aside", "-yg--")
+        other = session.fork()
+        other.apply("slick", "y-g-g")
+        other.remaining()  ->  ['brisk', 'frisk', 'whisk']
+        other.undo()
+    """
+    __slots__ = ("index", "node", "depth", "tree")
+
+    def __init__(self, index, node=None, depth=0, tree=None):
+        self.index = index
+        self.node = node if node is not None else (index.start, None, None, None,
+            tree.root if tree is not None else None)
+        self.depth = depth
+        self.tree = tree
+
+    @property
+    def candidates(self):
+        """Current candidate state, in the representation of the index's engine."""
+        return self.node[0]
+
+    def push(self, candidates, guess, clues):
+        """Record an attempt whose filtered candidates were computed elsewhere."""
+        tree_node = GreedyDecisionTree.child(self.node[4], guess, clues)
+        self.node = (candidates, guess, clues, self.node, tree_node)
+        self.depth += 1
+
+    def apply(self, guess, clues):
+        """Process an attempt, returning the number of words remaining."""
+        guess = check_guess(self.index, guess)
+        clues = check_clues(self.index, clues)
+        cache = self.index.cache
+        if cache is not None:
+            attempts = tuple(self.attempts()) + ((guess, clues),)
+            state = cache.get(self.index, attempts)
+            if state is None:
+                cons = compile_clues(guess, clues, self.index.abc)
+                state = self.index.engine.filter(self.candidates, cons)
+                cache.put(self.index, attempts, state)
+            self.push(state, guess, clues)
+            return self.count()
+        cons = compile_clues(guess, clues, self.index.abc)
+        self.push(self.index.engine.filter(self.candidates, cons), guess, clues)
+        return self.count()
+
+    def undo(self):
+        """Forget the last attempt, returning it as (guess, clues), or None."""
+        candidates, guess, clues, parent, tree_node = self.node
+        if parent is None:
+            return None
+        self.node = parent
+        self.depth -= 1
+        return guess, clues
+
+    def fork(self):
+        """Independent session starting from the current state."""
+        return WordleSession(self.index, self.node, self.depth, self.tree)
+
+    def follow(self, tree):
+        """
+        Follow the GreedyDecisionTree tree (or none), for next_guess().
+        The tree node reached is kept with each attempt, so next_guess()
+        is O(1), but switching trees goes over the whole history again.
+        """
+        if tree is self.tree:
+            return
+        history = []
+        node = self.node
+        while node[3] is not None:
+            history.append(node)
+            node = node[3]
+        self.node = node[:4] + (tree.root if tree is not None else None,)
+        self.tree = tree
+        for candidates, guess, clues, parent, tree_node in reversed(history):
+            self.node = (candidates, guess, clues, self.node,
+                GreedyDecisionTree.child(self.node[4], guess, clues))
+
+    def next_guess(self):
+        """Guess recommended by the tree followed, or None if off the tree."""
+        tree_node = self.node[4]
+        return tree_node[0] if tree_node is not None else None
+
+    def count(self):
+        return self.index.engine.count(self.candidates)
+
+    def remaining(self, ordered=True):
+        """Words still remaining (sorted, unless ordered is False)."""
+        return self.index.engine.words(self.candidates, ordered)
+
+    def contains(self, word):
+        return self.index.engine.contains(self.candidates, word)
+
+    def attempts(self):
+        """List of (guess, clues) processed so far, oldest first."""
+        result = []
+        node = self.node
+        while node[3] is not None:
+            result.append((node[1], node[2]))
+            node = node[3]
+        result.reverse()
+        return result
+
+
+# Decision tree file: header, then the nodes in preorder, each one as
+# the id of its guess (index in the sorted word list), its number of
+# children, and for each child the clue code leading to it, followed
+# by the child node itself
+WDT_MAGIC   = b"WDT2"
+WDT_HEADER  = struct.Struct("<4sHI16sHdI")
+# Guesses a game of Wordle allows
+MAX_GUESSES = 6
+# Words of the whole list tried as guesses at each node of a decision
+# tree, besides the answers reaching it (see _dt_choose_guess)
+DT_GUESSES  = 100
+
+# Globals for the tree building worker processes
+_dt_abc_str = None
+_dt_wordlist = None
+_dt_engine = None
+
+
+def _dt_init(abc_str, wordlist):
+    global _dt_abc_str, _dt_wordlist, _dt_engine
+    _dt_abc_str = abc_str
+    _dt_wordlist = wordlist
+    if have_numpy():
+        _dt_engine = NumpyEngine(wordlist, abc_str)
+
+
+def _dt_best_splits(present, placed):
+    """
+    The DT_GUESSES words of the list with the highest sum of the
+    weights in present of their letters, plus those in placed of their
+    (slot, letter) pairs, best first (and in list order if tied.)
+    """
+    if _dt_engine is not None:
+        codes = _dt_engine.codes
+        letters = _dt_engine.letters
+        weights = numpy.zeros(len(codes))
+        for ltr, weight in present.items():
+            weights[codes[ltr]] = weight
+        scores = (_dt_engine.counts > 0) @ weights
+        weights = numpy.zeros((letters.shape[1], len(codes)))
+        for (slot, ltr), weight in placed.items():
+            weights[slot, codes[ltr]] = weight
+        for slot in range(letters.shape[1]):
+            scores += weights[slot][letters[:, slot]]
+        top = numpy.argsort(-scores, kind="stable")[:DT_GUESSES]
+        return [_dt_wordlist[i] for i in top.tolist()]
+
+    def score(word):
+        return sum(present.get(ltr, 0) for ltr in set(word)) + \
+            sum(placed.get(slot_ltr, 0) for slot_ltr in enumerate(word))
+
+    return heapq.nlargest(DT_GUESSES, _dt_wordlist, key=score)
+
+
+def _dt_choose_guess(answers):
+    """
+    Guess with the most expected information over answers, among the
+    answers themselves and, unless one of them already tells every
+    answer apart, the DT_GUESSES words of the whole list that best
+    split the answers letter by letter. (Scoring every word of the
+    list at every node would take too long, and that split is a cheap
+    estimate of the information a word gives.) Ties go to answers.
+    """
+    n = len(answers)
+    if n <= 2:
+        return answers[0]
+    best, best_score = rank_guesses(answers, answers, _dt_abc_str, "entropy", nworkers=1)[0]
+    if best_score >= math.log2(n) - 1e-9:
+        return best
+    present = dict()
+    placed = dict()
+    for w in answers:
+        for ltr in set(w):
+            present[ltr] = present.get(ltr, 0) + 1
+        for slot_ltr in enumerate(w):
+            placed[slot_ltr] = placed.get(slot_ltr, 0) + 1
+    # A letter (in any slot, or in a given one) splits the answers the
+    # most when about half of them have it
+    present = dict((ltr, c * (n - c)) for ltr, c in present.items())
+    placed = dict((slot_ltr, c * (n - c)) for slot_ltr, c in placed.items())
+    others = _dt_best_splits(present, placed)
+    guess, score = rank_guesses(others, answers, _dt_abc_str, "entropy", nworkers=1)[0]
+    return guess if score > best_score + 1e-9 else best
+
+
+def _dt_build_node(answers, guess=None):
+    """
+    Build the subtree solving all of answers, returning the node as
+    (guess, {clue code: child}) and a dict with the number of answers
+    solved in each number of guesses.
+    """
+    if guess is None:
+        guess = _dt_choose_guess(answers)
+    groups = dict()
+    for answer in answers:
+        groups.setdefault(feedback(guess, answer), []).append(answer)
+    solved = "g" * len(guess)
+    children = dict()
+    guesses = {1: 1} if solved in groups else dict()
+    for clues, group in groups.items():
+        if clues == solved:
+            continue
+        child, child_guesses = _dt_build_node(group)
+        children[clues_code(clues)] = child
+        for n, count in child_guesses.items():
+            guesses[n + 1] = guesses.get(n + 1, 0) + count
+    return (guess, children), guesses
+
+
+def _dt_build_subtree(item):
+    code, answers = item
+    return (code,) + _dt_build_node(answers)
+
+
+class GreedyDecisionTree:
+    """
+    Complete solving tree for a word list and an opening guess: the
+    root recommends the opener, and each node maps the clue code
+    received for its guess to the node with the next recommended
+    guess. The answers reaching each node are split with the same
+    feedback() rules the helper's filtering is consistent with, so the
+    words the helper keeps always include those the tree can reach.
+
+    The tree is greedy, not optimal: the guess at each node is just the
+    one with the most expected information over the answers reaching
+    it (see _dt_choose_guess), any word of the list being a candidate,
+    without searching for the tree needing the fewest guesses overall.
+    Its depth (the most guesses any answer needs), avg_cost, and
+    nfailed (answers needing more than MAX_GUESSES) are those of this
+    tree, not the best ones for the opener.
+    """
+
+    def __init__(self, words, opener, cache_dir=CACHE_DIR, list_hash=None):
+        self.wordlist = sorted(words)
+        self.index = dict((w, i) for i, w in enumerate(self.wordlist))
+        self.wlen = len(opener)
+        self.opener = opener
+        self.list_hash = list_hash or wordlist_hash(self.wordlist)
+        self.path = os.path.join(cache_dir, "tree_{0}_{1}_{2}.wdt".format(
+            self.wlen, self.list_hash, opener))
+        self.root = None
+        self.depth = 0
+        self.avg_cost = 0.0
+        self.nfailed = 0
+
+    def exists(self):
+        """Whether the tree was saved for this word list, in the current format."""
+        try:
+            with open(self.path, "rb") as f:
+                header = f.read(WDT_HEADER.size)
+        except OSError:
+            return False
+        return len(header) == WDT_HEADER.size and self._matches(WDT_HEADER.unpack(header))
+
+    def _matches(self, header):
+        magic, wlen, nwords, list_hash = header[:4]
+        return magic == WDT_MAGIC and wlen == self.wlen and nwords == len(self.wordlist) \
+            and list_hash == self.list_hash.encode("ascii")
+
+    def build(self, abc_str, nworkers=None):
+        """Build the whole tree, the subtrees below the opener in parallel."""
+        answers = self.wordlist
+        groups = dict()
+        for answer in answers:
+            groups.setdefault(feedback(self.opener, answer), []).append(answer)
+        solved = "g" * self.wlen
+        items = [(clues_code(clues), group) for clues, group in groups.items() if clues != solved]
+        # Biggest subtrees first, so they do not end up running last
+        items.sort(key=lambda item: -len(item[1]))
+        results = parallel_map(_dt_build_subtree, items, nworkers, _dt_init,
+            (abc_str, self.wordlist))
+        children = dict()
+        guesses = {1: 1} if solved in groups else dict()
+        for code, child, child_guesses in results:
+            children[code] = child
+            for n, count in child_guesses.items():
+                guesses[n + 1] = guesses.get(n + 1, 0) + count
+        self.root = (self.opener, children)
+        self.depth = max(guesses, default=0)
+        self.avg_cost = sum(n * count for n, count in guesses.items()) / len(answers) \
+            if answers else 0.0
+        self.nfailed = sum(count for n, count in guesses.items() if n > MAX_GUESSES)
+
+    def save(self):
+        id_fmt = struct.Struct("<H" if len(self.wordlist) < 65536 else "<I")
+        count_fmt = struct.Struct("<H")
+        code_fmt = struct.Struct("<H" if 3 ** self.wlen <= 65536 else "<I")
+        index = self.index
+        data = bytearray(WDT_HEADER.pack(WDT_MAGIC, self.wlen, len(self.wordlist),
+            self.list_hash.encode("ascii"), self.depth, self.avg_cost, self.nfailed))
+
+        def write_node(node):
+            guess, children = node
+            data.extend(id_fmt.pack(index[guess]))
+            data.extend(count_fmt.pack(len(children)))
+            for code in sorted(children):
+                data.extend(code_fmt.pack(code))
+                write_node(children[code])
+
+        write_node(self.root)
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp." + str(os.getpid())
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        with open(self.path, "rb") as f:
+            data = f.read()
+        header = WDT_HEADER.unpack_from(data, 0)
+        magic, wlen, nwords, list_hash, depth, avg_cost, nfailed = header
+        if not self._matches(header):
+            raise ValueError("decision tree file '" + self.path + "' does not match the word list")
+        id_fmt = struct.Struct("<H" if nwords < 65536 else "<I")
+        count_fmt = struct.Struct("<H")
+        code_fmt = struct.Struct("<H" if 3 ** wlen <= 65536 else "<I")
+        wordlist = self.wordlist
+        pos = WDT_HEADER.size
+
+        def read_node():
+            nonlocal pos
+            guess = wordlist[id_fmt.unpack_from(data, pos)[0]]
+            pos += id_fmt.size
+            nchildren = count_fmt.unpack_from(data, pos)[0]
+            pos += count_fmt.size
+            children = dict()
+            for _ in range(nchildren):
+                code = code_fmt.unpack_from(data, pos)[0]
+                pos += code_fmt.size
+                children[code] = read_node()
+            return (guess, children)
+
+        self.root = read_node()
+        self.depth = depth
+        self.avg_cost = avg_cost
+        self.nfailed = nfailed
+
+    @staticmethod
+    def child(node, guess, clues):
+        """
+        Node reached from node with an attempt, or None if it leaves
+        the tree. The node's first item is the next guess.
+        """
+        if node is None or node[0] != guess or clues is None:
+            return None
+        return node[1].get(clues_code(clues))
+
+    def walk(self, attempts):
+        """Node reached after the given (guess, clues) attempts, or None."""
+        node = self.root
+        for guess, clues in attempts:
+            node = self.child(node, guess, clues)
+        return node
+
+    def next_guess(self, attempts):
+        node = self.walk(attempts)
+        return node[0] if node is not None else None
+
+
+class MultiBoardSession:
+    """
+    Several simultaneous games (as in Quordle or Octordle) over a
+    shared WordIndex, where every guess gets one clue string per board.
+    Each board is a WordleSession, and boards stay in step: every
+    attempt is pushed on all of them, solved boards keeping their
+    state, so undo() simply undoes the last attempt on each.
+
+        boards = MultiBoardSession(WordIndex.load("words_len5_en.txt"), 4)
+        boards.apply("aside", ["-yg--", "--y-g", "g----", "-----"])
+        boards.counts()  ->  [242, 139, 159, 759]
+    """
+    __slots__ = ("index", "boards", "solved")
+
+    def __init__(self, index, nboards):
+        self.index = index
+        self.boards = [WordleSession(index) for _ in range(nboards)]
+        # Attempt number in which each board was solved (0 if not yet)
+        self.solved = [0] * nboards
+
+    @property
+    def depth(self):
+        return self.boards[0].depth
+
+    def apply(self, guess, clues_list):
+        """
+        Process a guess with the clues for each board (those for boards
+        already solved are ignored), filtering every unsolved board
+        with the engine in turn. The batching only saves work by
+        deduplicating: each distinct clue string is compiled once for
+        all the boards getting it, but every board is still filtered
+        on its own. Returns the number of words remaining on each board.
+        """
+        guess = check_guess(self.index, guess)
+        if len(clues_list) != len(self.boards):
+            raise ValueError("{0} clue strings are needed, one per board".format(len(self.boards)))
+        clues_list = [clues if self.solved[b] else check_clues(self.index, clues)
+            for b, clues in enumerate(clues_list)]
+        engine = self.index.engine
+        solution = "g" * self.index.wlen
+        compiled = dict()
+        depth = self.depth + 1
+        for b, (board, clues) in enumerate(zip(self.boards, clues_list)):
+            if self.solved[b]:
+                board.push(board.candidates, guess, None)
+                continue
+            cons = compiled.get(clues)
+            if cons is None:
+                cons = compiled[clues] = compile_clues(guess, clues, self.index.abc)
+            board.push(engine.filter(board.candidates, cons), guess, clues)
+            if clues == solution:
+                self.solved[b] = depth
+        return self.counts()
+
+    def undo(self):
+        """Forget the last attempt, returning its guess, or None."""
+        if self.depth == 0:
+            return None
+        for b, board in enumerate(self.boards):
+            if self.solved[b] == board.depth:
+                self.solved[b] = 0
+            guess, clues = board.undo()
+        return guess
+
+    def counts(self):
+        return [board.count() for board in self.boards]
+
+    def unsolved(self):
+        """Boards not solved yet."""
+        return [board for b, board in enumerate(self.boards) if not self.solved[b]]
+
+    def is_solved(self):
+        return all(self.solved)
+
+
+def rank_guesses_joint(guesses, answer_sets, abc_str, metric="entropy", nworkers=None, fbmatrix=None):
+    """
+    Same as rank_guesses, but scoring each guess jointly over several
+    boards, by adding up its scores against each board's answers.
+    """
+    totals = dict()
+    for answers in answer_sets:
+        for guess, score in rank_guesses(guesses, answers, abc_str, metric, nworkers, fbmatrix):
+            totals[guess] = totals.get(guess, 0.0) + score
+    candidate = set().union(*answer_sets)
+    sign = -1 if metric == "entropy" else 1
+    return sorted(totals.items(), key=lambda gs: (sign * gs[1], gs[0] not in candidate, gs[0]))
@@ -0,0 +1,215 @@
+# SPDX-License-Identifier: MIT
+
+"""
+wordle_profile.py
+Created    : 2026.10.18
+
+Profiling for wordle-helper.py (option --profile): wall time, number
+of candidates in and out, and bytes printed, for every phase of a run
+(loading the word list, deriving the rules from the clues, filtering,
+showing the output, suggesting guesses) and for every kind of rule
+derived from the clues (G, Y, YR, -R, -*).
+
+For the per-rule figures, the filtering steps of each attempt are
+applied one at a time with the engine in use, each timed and counted
+under the kind of rule it comes from. The helper only creates a
+Profiler with --profile, so without it the only cost is checking that
+there is none at a few points of each attempt.
+
+Results can be shown as a table, saved as JSON, or saved as stats in
+the format written by cProfile, which pstats (or any viewer for those,
+like snakeviz) can load: phases become functions, with the rules as
+functions called from the filtering phase.
+
+Hooks are the programmatic interface: any callable added with
+Profiler.add_hook() gets every record as soon as it is taken, as
+
+    hook(kind, name, seconds, nin, nout, nbytes)
+
+where kind is "phase" or "rule", and name is the phase or rule kind.
+
+"""
+
+import json
+import marshal
+import time
+
+import wordle_engine
+
+PHASES      = ("load", "rules", "filter", "output", "suggest", "game")
+RULE_KINDS  = ("G", "Y", "YR", "-R", "-*")
+STATS_FILE  = "wordle-helper"      # File name given to the entries in cProfile stats
+
+
+def rule_kind(rule):
+    """Kind of a rule line of a Constraint (G, Y, YR, -R, or -*.)"""
+    code = rule.split(":")[0].strip()
+    if code.startswith("YR"):
+        return "YR"
+    if code[0] in "GY":
+        return code[0]
+    return "-*" if code.endswith("*") else "-R"
+
+
+class CountingWriter:
+    """
+    Text stream passing everything through, adding the bytes written
+    (as utf-8) to the nbytes of a Profiler.
+    """
+
+    def __init__(self, stream, profiler):
+        self.stream = stream
+        self.profiler = profiler
+
+    def write(self, text):
+        self.profiler.nbytes += len(text.encode("utf-8", "replace"))
+        return self.stream.write(text)
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class Profiler:
+    """
+    Accumulated records of a run, as [calls, seconds, nin, nout, nbytes]
+    for each (kind, name), kind being "phase" or "rule".
+
+        profiler = Profiler()
+        sys.stdout = profiler.wrap(sys.stdout)
+        mark = profiler.start()
+        state, remaining = profiler.filter_steps(engine, state, cons)
+        profiler.stop("filter", mark, nin, engine.count(state))
+    """
+
+    def __init__(self):
+        self.stats = dict()
+        self.hooks = []
+        self.nbytes = 0
+        self._mark = 0
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def wrap(self, stream):
+        """Wrap stream (usually sys.stdout) to count the bytes printed through it."""
+        return CountingWriter(stream, self)
+
+    def record(self, kind, name, seconds, nin=0, nout=0, nbytes=0, calls=1):
+        entry = self.stats.get((kind, name))
+        if entry is None:
+            entry = self.stats[(kind, name)] = [0, 0.0, 0, 0, 0]
+        entry[0] += calls
+        entry[1] += seconds
+        entry[2] += nin
+        entry[3] += nout
+        entry[4] += nbytes
+        for hook in self.hooks:
+            hook(kind, name, seconds, nin, nout, nbytes)
+
+    def start(self):
+        """Mark the start of a phase, to be passed to stop()."""
+        return time.perf_counter(), self.nbytes
+
+    def stop(self, name, mark, nin=0, nout=0):
+        start, printed = mark
+        self.record("phase", name, time.perf_counter() - start, nin, nout,
+            self.nbytes - printed)
+
+    def filter_steps(self, engine, state, cons):
+        """
+        Same as engine.filter_steps(state, cons), but applying the steps
+        one at a time and recording each under the kind of its rule.
+        """
+        single = wordle_engine.Constraint(cons.wlen, cons.abc)
+        remaining = []
+        nin = engine.count(state)
+        seen = set()
+        for step, r in zip(cons.steps, cons.step_rules):
+            single.steps = [step]
+            start = time.perf_counter()
+            state, counts = engine.filter_steps(state, single)
+            seconds = time.perf_counter() - start
+            nout = counts[0]
+            # (The step of all G rules counts as a call of each of them)
+            if step[0] == wordle_engine.FIXED:
+                calls = len(step[1])
+            else:
+                calls = 0 if r in seen else 1
+            self.record("rule", rule_kind(cons.rules[r]), seconds, nin, nout, calls=calls)
+            seen.add(r)
+            remaining.append(nout)
+            nin = nout
+        return state, remaining
+
+    def mark(self):
+        """Start counting the bytes printed for a rule, see printed_for()."""
+        self._mark = self.nbytes
+
+    def printed_for(self, rule):
+        """Record the bytes printed since the last mark as printed for rule."""
+        printed = self.nbytes
+        self.record("rule", rule_kind(rule), 0.0, nbytes=printed - self._mark, calls=0)
+        self._mark = printed
+
+    def entries(self, kind, order):
+        """(name, calls, seconds, nin, nout, nbytes) for the records of kind, in order."""
+        names = [n for n in order if (kind, n) in self.stats]
+        names += sorted(n for k, n in self.stats if k == kind and n not in order)
+        return [(n, *self.stats[(kind, n)]) for n in names]
+
+    def report(self, out):
+        """Print the records as a table to out."""
+        for kind, title, order in (("phase", "Phase", PHASES), ("rule", "Rule", RULE_KINDS)):
+            if not self.entries(kind, order):
+                continue
+            print("{0:<8} {1:>7} {2:>11} {3:>10} {4:>12} {5:>12} {6:>10}".format(title,
+                "calls", "total ms", "ms/call", "words in", "words out", "bytes"), file=out)
+            for name, calls, seconds, nin, nout, nbytes in self.entries(kind, order):
+                print("{0:<8} {1:>7} {2:>11.3f} {3:>10.4f} {4:>12} {5:>12} {6:>10}".format(name,
+                    calls, 1000 * seconds, 1000 * seconds / calls if calls else 0.0,
+                    nin, nout, nbytes), file=out)
+
+    def to_json(self):
+        result = dict()
+        for kind, key, order in (("phase", "phases", PHASES), ("rule", "rules", RULE_KINDS)):
+            result[key] = dict((name, {"calls": calls, "seconds": seconds, "in": nin,
+                    "out": nout, "bytes": nbytes})
+                for name, calls, seconds, nin, nout, nbytes in self.entries(kind, order))
+        return result
+
+    def save_json(self, fname):
+        with open(fname, "w") as f:
+            json.dump(self.to_json(), f, indent=1)
+
+    def save_stats(self, fname):
+        """
+        Save the records in the marshal format of cProfile stats, i.e.
+        {(file, line, function): (calls, calls, own time, total time, callers)}.
+        """
+        stats = dict()
+        phases = self.entries("phase", PHASES)
+        rules = self.entries("rule", RULE_KINDS)
+        filter_key = (STATS_FILE, 0, "phase filter")
+        rules_seconds = 0.0
+        rules_calls = 0
+        for name, calls, seconds, nin, nout, nbytes in rules:
+            calls = max(calls, 1)
+            stats[(STATS_FILE, 0, "rule " + name)] = (calls, calls, seconds, seconds,
+                {filter_key: (calls, calls, seconds, seconds)})
+            rules_seconds += seconds
+            rules_calls += calls
+        for name, calls, seconds, nin, nout, nbytes in phases:
+            own = seconds - rules_seconds if name == "filter" else seconds
+            stats[(STATS_FILE, 0, "phase " + name)] = (calls, calls, max(own, 0.0), seconds, dict())
+        if rules and filter_key not in stats:
+            # Rules can be timed without the helper's filter phase (e.g. from a hook user)
+            stats[filter_key] = (rules_calls, rules_calls, 0.0, rules_seconds, dict())
+        with open(fname, "wb") as f:
+            marshal.dump(stats, f)
+
+    def save(self, fname):
+        """Save as JSON, or as cProfile stats if fname does not end in .json"""
+        if fname.endswith(".json"):
+            self.save_json(fname)
+        else:
+            self.save_stats(fname)
@@ -0,0 +1,273 @@
+# SPDX-License-Identifier: MIT
+
+"""
+wordle_server.py
+Created    : 2026.10.18
+
+Long-running server mode for wordle-helper.py (option --serve).
+
+Clients connect to a local socket and send one JSON object per line,
+getting one JSON object per line back. Each word list is loaded only
+once, and any number of concurrent games (sessions) are kept in memory,
+each with its own set of candidate words.
+
+Requests:
+
+    {"session": "s1", "guess": "crane", "clues": "--y--"}
+        Process an attempt for session s1 (created if needed, ids are
+        strings or integers). Optional fields: "list" ("en", "es", or the
+        word list file given with -w), "wlen" (word length, one of those
+        in the list), and "max" (maximum number of words to return.) Their
+        defaults are given by the -s/-w, -l, and -n options. With
+        "tree" (an opening guess), the response also includes as "next"
+        the guess recommended by the decision tree built for it (see
+        option -t), or null once the attempts leave the tree.
+
+    {"session": "s1", "op": "undo"}
+        Forget the last attempt of session s1.
+
+    {"session": "s1", "op": "reset"}
+        Start session s1 over from the whole word list.
+
+    {"session": "s1", "op": "end"}
+        Forget session s1.
+
+    {"op": "stats"}
+        Hit and miss counters of the prefix cache (see option --cache.)
+
+    {"op": "query", "query": "s?a?e -r e>=2"}
+        Words matching a wildcard and letter count query (see option
+        --query), answered from the index of the word list, e.g. for
+        autocompletion. Optional fields "list", "wlen", and "max" as
+        for attempts, with up to "max" of the matching words returned
+        in alphabetical order, however many there are:
+
+        {"query": "s?a?e -r e>=2", "count": 3, "words": [...]}
+
+Responses for attempts:
+
+    {"session": "s1", "attempt": 1, "remaining": 91, "words": [...]}
+    {"session": "s1", "attempt": 1, "remaining": 91, "next": "doily"}
+
+or {"error": "..."} if something went wrong with the request.
+
+"""
+
+import asyncio
+import json
+import time
+
+import wordle_engine
+
+DEFAULT_PORT    = 8585
+WORDLISTS       = {"en": ["words_len5_en.txt", "words_len7_en.txt"],
+                   "es": ["words_len5_es.txt"]}
+SESSION_TTL     = 3600      # Seconds after which idle sessions are dropped
+BACKLOG         = 4096      # Pending connections allowed by the socket
+
+
+class Session:
+    __slots__ = ("game", "last_used")
+
+    def __init__(self, index):
+        self.game = wordle_engine.WordleSession(index)
+        self.last_used = time.monotonic()
+
+
+class WordleServer:
+
+    def __init__(self, engine_name="bitset", show_max_n=100, default_list="en", default_wlen=5,
+            default_tree=None, cache=None):
+        self.engine_name = engine_name
+        self.show_max_n = show_max_n
+        self.default_list = default_list
+        self.default_wlen = default_wlen
+        self.default_tree = default_tree
+        self.cache = cache
+        # Only the configured lists (and the one given with -w) can be used
+        sources = dict(WORDLISTS)
+        if default_list not in sources:
+            sources[default_list] = [default_list]
+        self.corpus = wordle_engine.Corpus(sources, engine_name)
+        self.trees = dict()
+        self.sessions = dict()
+
+    def get_wordlist(self, name, wlen):
+        if not isinstance(name, str):
+            raise ValueError("'list' must be a string")
+        index = self.corpus.index(name, wlen)
+        index.cache = self.cache
+        return index
+
+    def get_tree(self, index, opener, build=False):
+        """
+        Decision tree for opener over the index's words. Trees are
+        only built here when asked to (at start-up), as building one
+        would block every other client meanwhile.
+        """
+        key = (id(index), opener)
+        tree = self.trees.get(key)
+        if tree is None:
+            if opener not in index.words:
+                raise ValueError("opener '" + opener + "' is not in the word list")
+            tree = wordle_engine.GreedyDecisionTree(index.words, opener,
+                list_hash=index.list_hash)
+            if tree.exists():
+                tree.load()
+            elif build:
+                tree.build(index.abc_str)
+                tree.save()
+            else:
+                raise ValueError("no decision tree has been built for '" + opener + "'")
+            self.trees[key] = tree
+        return tree
+
+    def handle_request(self, req):
+        """Process one decoded request, returning the response."""
+        if not isinstance(req, dict):
+            return {"error": "request must be a JSON object"}
+        if req.get("op") == "stats":
+            return self.cache.stats() if self.cache is not None else {"error": "no prefix cache"}
+        if req.get("op") == "query":
+            return self.handle_query(req)
+        sid = req.get("session")
+        if sid is None:
+            return {"error": "missing 'session'"}
+        if not isinstance(sid, (str, int)):
+            return {"error": "'session' must be a string or an integer"}
+        op = req.get("op", "attempt")
+        if op == "end":
+            self.sessions.pop(sid, None)
+            return {"session": sid, "ended": True}
+        session = self.sessions.get(sid)
+        if session is None or op == "reset":
+            wlen = req.get("wlen", self.default_wlen)
+            if not isinstance(wlen, int) or wlen < 1:
+                return {"session": sid, "error": "invalid 'wlen'"}
+            try:
+                index = self.get_wordlist(req.get("list", self.default_list), wlen)
+            except ValueError as e:
+                return {"session": sid, "error": str(e)}
+            except OSError as e:
+                return {"session": sid, "error": "cannot load word list: " + str(e)}
+            session = Session(index)
+            self.sessions[sid] = session
+        session.last_used = time.monotonic()
+        game = session.game
+        if op == "undo":
+            game.undo()
+        elif op == "attempt":
+            guess = str(req.get("guess", "")).strip()
+            clues = str(req.get("clues", "")).strip()
+            try:
+                game.apply(guess, clues)
+            except ValueError as e:
+                return {"session": sid, "error": str(e)}
+        elif op != "reset":
+            return {"session": sid, "error": "unknown op '" + str(op) + "'"}
+        nwords = game.count()
+        resp = {"session": sid, "attempt": game.depth, "remaining": nwords}
+        max_n = req.get("max", self.show_max_n)
+        if op != "reset" and isinstance(max_n, int) and nwords <= max_n:
+            resp["words"] = game.remaining()
+        opener = req.get("tree", self.default_tree)
+        if opener:
+            try:
+                tree = self.get_tree(game.index, str(opener).lower())
+            except (OSError, ValueError) as e:
+                resp["error"] = "decision tree: " + str(e)
+                return resp
+            game.follow(tree)
+            resp["next"] = game.next_guess()
+        return resp
+
+    def handle_query(self, req):
+        text = str(req.get("query", ""))
+        wlen = req.get("wlen", self.default_wlen)
+        if not isinstance(wlen, int) or wlen < 1:
+            return {"query": text, "error": "invalid 'wlen'"}
+        max_n = req.get("max", self.show_max_n)
+        if not isinstance(max_n, int) or max_n < 0:
+            return {"query": text, "error": "invalid 'max'"}
+        try:
+            index = self.get_wordlist(req.get("list", self.default_list), wlen)
+        except ValueError as e:
+            return {"query": text, "error": str(e)}
+        except OSError as e:
+            return {"query": text, "error": "cannot load word list: " + str(e)}
+        try:
+            nwords, words = index.query(text, max_n)
+        except ValueError as e:
+            return {"query": text, "error": str(e)}
+        return {"query": text, "count": nwords, "words": words}
+
+    def expire_sessions(self):
+        oldest = time.monotonic() - SESSION_TTL
+        for sid in [sid for sid, s in self.sessions.items() if s.last_used < oldest]:
+            del self.sessions[sid]
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    req = json.loads(line)
+                except ValueError as e:
+                    resp = {"error": "invalid JSON: " + str(e)}
+                else:
+                    try:
+                        resp = self.handle_request(req)
+                    except Exception as e:
+                        # A bad request must not drop the connection
+                        resp = {"error": str(e)}
+                writer.write(json.dumps(resp, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def expire_loop(self):
+        while True:
+            await asyncio.sleep(SESSION_TTL / 10)
+            self.expire_sessions()
+
+    async def serve(self, address):
+        if address.isdecimal():
+            server = await asyncio.start_server(self.handle_client, "127.0.0.1", int(address),
+                backlog=BACKLOG)
+        elif ":" in address:
+            host, port = address.rsplit(":", 1)
+            server = await asyncio.start_server(self.handle_client, host, int(port),
+                backlog=BACKLOG)
+        else:
+            server = await asyncio.start_unix_server(self.handle_client, address,
+                backlog=BACKLOG)
+        print("Serving on " + address + " (one JSON request per line)", flush=True)
+        expiring = asyncio.ensure_future(self.expire_loop())
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            expiring.cancel()
+
+
+def serve(address, engine_name="bitset", show_max_n=100, default_list="en", wlen=5, tree="",
+        cache=None):
+    server = WordleServer(engine_name, show_max_n, default_list, wlen, tree or None, cache)
+    # Load the default word list (and tree) right away, before accepting connections
+    index = server.get_wordlist(default_list, wlen)
+    if tree:
+        dtree = server.get_tree(index, tree, build=True)
+        print("Decision tree for '{0}': depth {1}, average of {2:.4f} guesses per word, "
+            "{3} words needing more than {4}".format(tree, dtree.depth, dtree.avg_cost,
+            dtree.nfailed, wordle_engine.MAX_GUESSES))
+    try:
+        asyncio.run(server.serve(address))
+    except KeyboardInterrupt:
+        print("Server stopped.")
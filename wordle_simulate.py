@@ -0,0 +1,136 @@
+# SPDX-License-Identifier: MIT
+
+"""
+wordle_simulate.py
+Created    : 2026.10.18
+
+Whole-dictionary simulation for wordle-helper.py (option --simulate).
+
+Plays one game against every word of the word list as the solution,
+using the helper's clue processing and filtering to narrow down the
+candidates, and a guess strategy to pick the next guess from them:
+
+    first   : the first remaining candidate in alphabetical order
+    entropy : the guess with the highest expected information gain
+              (best first guess over the whole list, and the best
+              remaining candidate afterwards)
+    size    : like entropy, but minimizing the expected number of
+              words remaining
+
+Games are independent, so they are split across a process pool, and
+results are collected as they finish. Besides the guess statistics,
+the wall time per game makes this a throughput benchmark for the
+filtering engine.
+
+"""
+
+import time
+
+import wordle_engine
+
+STRATEGIES  = ("first", "entropy", "size")
+MAX_GUESSES = 6         # Games needing more guesses count as failures
+GIVE_UP     = 50        # Games are abandoned after this many guesses
+CHUNK_SIZE  = 64        # Games sent to each worker at a time
+
+# Globals for the simulation worker processes
+_sim_engine = None
+_sim_abc_str = None
+_sim_strategy = None
+_sim_first_guess = None
+
+
+def _sim_init(words, abc_str, engine_name, strategy, first_guess):
+    global _sim_engine, _sim_abc_str, _sim_strategy, _sim_first_guess
+    _sim_engine = wordle_engine.make_engine(engine_name, words, abc_str)
+    _sim_abc_str = abc_str
+    _sim_strategy = strategy
+    _sim_first_guess = first_guess
+
+
+def next_guess(engine, candidates, abc_str, strategy):
+    """Guess chosen by strategy among the remaining candidates."""
+    remaining = engine.words(candidates)
+    if strategy == "first" or len(remaining) <= 2:
+        return remaining[0]
+    ranking = wordle_engine.rank_guesses(remaining, remaining, abc_str, strategy, nworkers=1)
+    return ranking[0][0]
+
+
+def play_game(engine, abc_str, answer, strategy, first_guess=None):
+    """
+    Play a game with answer as solution, returning the number of
+    guesses needed (or GIVE_UP + 1 if it was abandoned.)
+    """
+    candidates = engine.start()
+    guess = first_guess
+    for n in range(1, GIVE_UP + 1):
+        if guess is None:
+            guess = next_guess(engine, candidates, abc_str, strategy)
+        clues = wordle_engine.feedback(guess, answer)
+        if clues == "g" * len(answer):
+            return n
+        cons = wordle_engine.compile_clues(guess, clues, abc_str)
+        candidates = engine.filter(candidates, cons)
+        guess = None
+    return GIVE_UP + 1
+
+
+def _sim_play_chunk(answers):
+    results = []
+    for answer in answers:
+        start = time.perf_counter()
+        nguesses = play_game(_sim_engine, _sim_abc_str, answer, _sim_strategy, _sim_first_guess)
+        results.append((answer, nguesses, time.perf_counter() - start))
+    return results
+
+
+def simulate_games(words, abc_str, engine_name="bitset", strategy="first", nworkers=None, fbmatrix=None):
+    """
+    Generator playing a game for every word in words, yielding lists
+    of (answer, guesses, seconds) as each chunk of games finishes.
+    """
+    first_guess = None
+    if strategy != "first":
+        ranking = wordle_engine.first_guess_ranking(words, abc_str, strategy,
+            nworkers, fbmatrix)
+        first_guess = ranking[0][0]
+    answers = sorted(words)
+    chunks = [answers[s:s + CHUNK_SIZE] for s in range(0, len(answers), CHUNK_SIZE)]
+    initargs = (words, abc_str, engine_name, strategy, first_guess)
+    yield from wordle_engine.parallel_map(_sim_play_chunk, chunks, nworkers, _sim_init, initargs)
+
+
+def simulate(words, abc_str, engine_name="bitset", strategy="first", nworkers=None, fbmatrix=None):
+    """Run the whole simulation printing progress, and a final report."""
+    print("Simulating {0} games with the '{1}' strategy and the '{2}' engine...".format(
+        len(words), strategy, engine_name))
+    start = time.perf_counter()
+    distribution = dict()
+    times = []
+    ndone = 0
+    total_guesses = 0
+    for results in simulate_games(words, abc_str, engine_name, strategy, nworkers, fbmatrix):
+        for answer, nguesses, seconds in results:
+            distribution[nguesses] = distribution.get(nguesses, 0) + 1
+            total_guesses += nguesses
+            times.append(seconds)
+        ndone += len(results)
+        print("\tGames done: {0}/{1}, average guesses so far: {2:.3f}".format(
+            ndone, len(words), total_guesses / ndone), flush=True)
+    elapsed = time.perf_counter() - start
+    if ndone == 0:
+        print("No games to simulate.")
+        return distribution
+    print("Guesses   Games")
+    for nguesses in sorted(distribution):
+        label = str(nguesses) if nguesses <= GIVE_UP else "gave up"
+        print("{0:>7}   {1}".format(label, distribution[nguesses]))
+    failures = sum(n for g, n in distribution.items() if g > MAX_GUESSES)
+    times.sort()
+    print("Average guesses: {0:.4f}".format(total_guesses / ndone))
+    print("Failures (more than {0} guesses): {1}".format(MAX_GUESSES, failures))
+    print("Time per game: average {0:.3f} ms, median {1:.3f} ms, max {2:.3f} ms".format(
+        1000 * sum(times) / ndone, 1000 * times[ndone // 2], 1000 * times[-1]))
+    print("Total wall time: {0:.2f} s ({1:.1f} games/s)".format(elapsed, ndone / elapsed))
+    return distribution
@@ -0,0 +1,120 @@
+# SPDX-License-Identifier: MIT
+
+"""
+wordle_testing.py
+Created    : 2026.10.18
+
+Shared by the test programs (test_engine.py, test_server.py, and
+test_helper.py): the word lists and indexes they test with, running
+wordle-helper.py in-process, and running the tests of one of them as
+a script, without pytest:
+
+    if __name__ == '__main__':
+        sys.exit(wordle_testing.run_tests(globals()))
+
+"""
+
+import contextlib
+import importlib.util
+import io
+import os
+import string
+
+import wordle_engine
+
+HERE        = os.path.dirname(os.path.abspath(__file__))
+HELPER_PY   = os.path.join(HERE, "wordle-helper.py")
+WORDLIST    = os.path.join(HERE, "words_len5_en.txt")
+ABC_STR     = string.ascii_lowercase
+ENGINES     = ["bitset", "set", "packed"] + (["numpy"] if wordle_engine.have_numpy() else [])
+# A small word list, for what would take long over a whole one
+SMALL_WORDS = ["aside", "brisk", "frisk", "whisk", "slick", "crane", "crate", "trace",
+               "react", "cater", "eerie", "geese", "sweet", "tweet", "skate", "stake",
+               "steak", "teaks", "aback", "abaca"]
+
+_indexes = dict()
+
+
+def full_index(engine_name="bitset"):
+    """WordIndex of the whole English list for engine_name, loaded only once."""
+    index = _indexes.get(engine_name)
+    if index is None:
+        index = _indexes[engine_name] = wordle_engine.WordIndex.load(WORDLIST, 5, engine_name)
+    return index
+
+
+def small_index(engine_name="bitset", words=SMALL_WORDS):
+    return wordle_engine.WordIndex(words, ABC_STR, engine_name)
+
+
+def helper_module():
+    """A fresh copy of the module of wordle-helper.py, with its defaults."""
+    spec = importlib.util.spec_from_file_location("wordle_helper_test", HELPER_PY)
+    helper = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(helper)
+    return helper
+
+
+class AtExit:
+    """
+    Stand-in for the atexit module in a copy of the helper's module,
+    to run the functions it registers at the end of each run instead.
+    """
+
+    def __init__(self):
+        self.funcs = []
+
+    def register(self, func, *args, **kwargs):
+        self.funcs.append((func, args, kwargs))
+        return func
+
+    def run(self):
+        while self.funcs:
+            func, args, kwargs = self.funcs.pop()
+            func(*args, **kwargs)
+
+
+def run_helper(args):
+    """
+    Run wordle-helper.py with args in-process (with a fresh copy of its
+    module, as wordle-tester.py does), returning (exit code, stdout,
+    stderr.) What the helper does at exit (e.g. writing the records
+    buffered, or the profile) is done at the end of the run.
+    """
+    out = io.StringIO()
+    err = io.StringIO()
+    code = 0
+    with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+        helper = helper_module()
+        helper.atexit = AtExit()
+        try:
+            helper.do_wordle_helper(args)
+        except SystemExit as e:
+            code = e.code or 0
+        helper.atexit.run()
+    return code, out.getvalue(), err.getvalue()
+
+
+def run_tests(namespace):
+    """
+    Run every test_ function in namespace (the globals of a test
+    program), from this directory, printing whether each one passed.
+    Returns the exit code: 1 if any test failed, 0 otherwise.
+    """
+    os.chdir(HERE)
+    tests = [(name, test) for name, test in namespace.items()
+        if name.startswith("test_") and callable(test)]
+    nfailed = 0
+    for name, test in tests:
+        try:
+            test()
+        except Exception as e:
+            print("{0:<32} FAILED: {1!r}".format(name, e))
+            nfailed += 1
+        else:
+            print("{0:<32} passed".format(name))
+    if nfailed > 0:
+        print("\t{0} of {1} tests failed!".format(nfailed, len(tests)))
+        return 1
+    print("\tAll tests passed!")
+    return 0
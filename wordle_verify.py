@@ -0,0 +1,189 @@
+# SPDX-License-Identifier: MIT
+
+"""
+wordle_verify.py
+Created    : 2026.10.18
+
+Exhaustive differential verification for wordle-helper.py (option
+--verify) of the clue processing and filtering used in process_attempt,
+against the true Wordle feedback of every guess/answer pair in the
+word list.
+
+For each guess, the whole list is split into the sets of answers that
+get each feedback pattern, without going pair by pair: answers are
+split with the bitset index by the slots where they match the guess
+(greens), then by how many times they have each letter of the guess,
+which together determine the pattern. One answer of each set is also
+checked with feedback(), as a safeguard on the index itself. Then, for
+each pattern, the words kept by filtering with the guess and those
+clues must be exactly that set:
+
+    dropped : answers removed although they get exactly those clues
+              (the solution itself could be filtered out)
+    kept    : words kept although they would get different clues
+              (filtering is weaker than it could be)
+
+Mismatches are grouped by the clues given to each repeated letter of
+the guess, and by whether the word has repeated letters, with the
+smallest guess/clues/word triple of each group reported as a minimal
+reproduction. Guesses are split across a process pool.
+
+"""
+
+import time
+
+import wordle_engine
+
+CHUNK_SIZE  = 64        # Guesses sent to each worker at a time
+
+# Globals for the verification worker processes
+_vf_index = None
+_vf_engine = None
+_vf_abc = None
+
+
+def _vf_init(words, abc_str, engine_name):
+    global _vf_index, _vf_engine, _vf_abc
+    _vf_index = wordle_engine.BitsetEngine(words, abc_str)
+    _vf_engine = wordle_engine.make_engine(engine_name, words, abc_str)
+    _vf_abc = frozenset(abc_str)
+
+
+def feedback_partition(index, guess):
+    """
+    Dict mapping each feedback pattern guess gets to the bitset of the
+    index's words getting it.
+    """
+    wlen = len(guess)
+    groups = [(index.all, ())]
+    for i in range(wlen):
+        bits = index.slot_bits.get((i, guess[i]), 0)
+        split = []
+        for state, greens in groups:
+            if state & bits:
+                split.append((state & bits, greens + (True,)))
+            if state & ~bits:
+                split.append((state & ~bits, greens + (False,)))
+        groups = split
+    # Number of times each letter of the guess is in the answer, which
+    # matters only up to the number of times it is in the guess
+    letters = sorted(set(guess))
+    groups = [(state, greens, ()) for state, greens in groups]
+    for ltr in letters:
+        most = guess.count(ltr)
+        split = []
+        for state, greens, counts in groups:
+            for n in range(most + 1):
+                bits = state
+                if n > 0:
+                    bits &= index.count_bits.get((ltr, n), 0)
+                if n < most:
+                    bits &= ~index.count_bits.get((ltr, n + 1), 0)
+                if bits:
+                    split.append((bits, greens, counts + (n,)))
+        groups = split
+    partition = dict()
+    for state, greens, counts in groups:
+        result = ["g" if green else "-" for green in greens]
+        for ltr, n in zip(letters, counts):
+            available = n - sum(1 for i in range(wlen) if greens[i] and guess[i] == ltr)
+            for i in range(wlen):
+                if guess[i] == ltr and not greens[i] and available > 0:
+                    result[i] = "y"
+                    available -= 1
+        partition["".join(result)] = state
+    return partition
+
+
+def signature(guess, clues, word):
+    """Group of a mismatch: clues of each repeated letter of guess, and repeats in word."""
+    parts = []
+    for ltr in sorted(set(guess)):
+        if guess.count(ltr) > 1:
+            parts.append("".join(c for g, c in zip(guess, clues) if g == ltr))
+    sig = "guess repeats " + ",".join(parts) if parts else "no repeats in guess"
+    if len(set(word)) < len(word):
+        sig += ", word repeats"
+    return sig
+
+
+def _lowest_word(engine, state):
+    return engine.wordlist[(state & -state).bit_length() - 1]
+
+
+def _vf_check_chunk(guesses):
+    """
+    Check every guess, returning the number of pairs checked, and for
+    each kind of mismatch a dict {signature: [pairs, (guess, clues, word)]}.
+    """
+    index = _vf_index
+    engine = _vf_engine
+    npairs = 0
+    found = {"dropped": dict(), "kept": dict()}
+    for guess in guesses:
+        for clues, exact in feedback_partition(index, guess).items():
+            npairs += exact.bit_count()
+            sample = _lowest_word(index, exact)
+            if wordle_engine.feedback(guess, sample) != clues:
+                raise AssertionError("bitset index disagrees with feedback() for {0} {1}".format(
+                    guess, sample))
+            cons = wordle_engine.compile_clues(guess, clues, _vf_abc)
+            state, remaining = engine.filter_steps(engine.start(), cons)
+            kept = index.from_bytes(engine.to_bytes(state))
+            for kind, wrong in (("dropped", exact & ~kept), ("kept", kept & ~exact)):
+                while wrong:
+                    word = _lowest_word(index, wrong)
+                    wrong &= wrong - 1
+                    group = found[kind].setdefault(signature(guess, clues, word), [0, None])
+                    group[0] += 1
+                    example = (guess, clues, word)
+                    if group[1] is None or example < group[1]:
+                        group[1] = example
+    return len(guesses), npairs, found
+
+
+def verify_chunks(words, abc_str, engine_name="bitset", nworkers=None):
+    """Generator of the results of _vf_check_chunk as each chunk of guesses finishes."""
+    guesses = sorted(words)
+    chunks = [guesses[s:s + CHUNK_SIZE] for s in range(0, len(guesses), CHUNK_SIZE)]
+    initargs = (words, abc_str, engine_name)
+    yield from wordle_engine.parallel_map(_vf_check_chunk, chunks, nworkers, _vf_init, initargs)
+
+
+def verify(words, abc_str, engine_name="bitset", nworkers=None):
+    """
+    Run the whole verification printing progress, and a final report.
+    Returns the total number of mismatching pairs.
+    """
+    print("Verifying filtering for all {0} x {0} guess/answer pairs with the '{1}' engine...".format(
+        len(words), engine_name))
+    start = time.perf_counter()
+    ndone = 0
+    npairs = 0
+    found = {"dropped": dict(), "kept": dict()}
+    for nguesses, pairs, chunk_found in verify_chunks(words, abc_str, engine_name, nworkers):
+        ndone += nguesses
+        npairs += pairs
+        for kind, groups in chunk_found.items():
+            for sig, (count, example) in groups.items():
+                group = found[kind].setdefault(sig, [0, None])
+                group[0] += count
+                if group[1] is None or example < group[1]:
+                    group[1] = example
+        print("\tGuesses done: {0}/{1}".format(ndone, len(words)), flush=True)
+    elapsed = time.perf_counter() - start
+    print("Pairs checked: {0} in {1:.1f} s ({2:.0f} pairs/s)".format(npairs, elapsed,
+        npairs / elapsed if elapsed > 0 else 0))
+    total = 0
+    for kind, title in (("dropped", "Answers wrongly discarded"),
+                        ("kept", "Inconsistent words kept")):
+        groups = found[kind]
+        count = sum(c for c, example in groups.values())
+        total += count
+        print("{0}: {1}".format(title, count))
+        for sig in sorted(groups, key=lambda sig: -groups[sig][0]):
+            count, (guess, clues, word) = groups[sig]
+            print("\t{0:>9}  {1}".format(count, sig))
+            print("\t{0:>9}  e.g. guess {1}, clues {2}, word {3} (which would get {4})".format(
+                "", guess, clues, word, wordle_engine.feedback(guess, word)))
+    return total